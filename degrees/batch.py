@@ -0,0 +1,153 @@
+import argparse
+import json
+import multiprocessing
+import sys
+
+import degrees
+from graph import bidirectional_search, breadth_first_tree, path_to
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer degrees of separation queries as JSON lines."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("queries", nargs="?",
+                        help="file of tab-separated queries (default: stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering queries")
+    parser.add_argument("--compact", action="store_true",
+                        help="load into compact arrays and string tables")
+    parser.add_argument("--memory-limit", type=int,
+                        help="megabytes a compact load may take")
+    args = parser.parse_args()
+
+    if args.compact:
+        memory_limit = None if args.memory_limit is None else args.memory_limit * 2 ** 20
+        degrees.load_compact_data(args.directory, memory_limit)
+    else:
+        degrees.load_data(args.directory)
+    if args.queries is not None:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = read_queries(f)
+    else:
+        queries = read_queries(sys.stdin)
+
+    for result in answer_queries(queries, args.workers):
+        print(json.dumps(result), flush=True)
+
+
+def read_queries(f):
+    """
+    Read one query per line from `f`, as a source and a target separated
+    by a tab. Each may be a person ID or an exact (case-insensitive) name.
+    Returns a list of (source, target) pairs; blank lines are skipped.
+    """
+    queries = []
+    for line in f:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        source, _, target = line.partition("\t")
+        queries.append((source.strip(), target.strip()))
+    return queries
+
+
+def resolve_person(query):
+    """
+    Returns the person ID for `query`, which may be an ID or a name.
+    Raises ValueError if no single person matches.
+    """
+    if query in degrees.index.person_index:
+        return query
+    person_ids = degrees.get_name_index().exact(query)
+    if len(person_ids) == 0:
+        raise ValueError(f"Person not found: {query}")
+    if len(person_ids) > 1:
+        raise ValueError(f"Ambiguous name: {query} (IDs {', '.join(person_ids)})")
+    return person_ids[0]
+
+
+def answer_queries(queries, workers=1):
+    """
+    Yield a result dictionary for every (source, target) query.
+
+    Queries sharing a source are answered together from a single
+    breadth-first tree, so results are grouped by source; each result
+    carries the number of its query in `queries` as `query`.
+
+    With more than one worker, groups are answered by a pool of forked
+    processes that share the loaded graph with this one, and results
+    arrive in whatever order the workers finish.
+    """
+    if degrees.index is None:
+        degrees.build_index()
+    index = degrees.index
+
+    # Group the resolvable queries by source, reporting the rest right away
+    groups = {}
+    for number, (source, target) in enumerate(queries):
+        result = {"query": number, "source": source, "target": target}
+        try:
+            source_id = resolve_person(source)
+            target_id = resolve_person(target)
+        except ValueError as e:
+            result["error"] = str(e)
+            yield result
+            continue
+        result["source"] = source_id
+        result["target"] = target_id
+        source = index.person_index[source_id]
+        target = index.person_index[target_id]
+        if not degrees.components.connected(source, target):
+            yield with_path(result, None)
+            continue
+        groups.setdefault(source, []).append((target, result))
+    groups = list(groups.items())
+
+    # Workers only see the graph without reloading it if they are forked
+    if workers > 1 and len(groups) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        chunksize = max(1, len(groups) // (workers * 4))
+        with context.Pool(workers) as pool:
+            for results in pool.imap_unordered(answer_group, groups, chunksize):
+                yield from results
+    else:
+        for group in groups:
+            yield from answer_group(group)
+
+
+def answer_group(group):
+    """
+    Answer every query in `group`, a source and a list of (target, result)
+    pairs, and return the completed results.
+    """
+    index = degrees.index
+    source, targets = group
+    if len(targets) == 1:
+        target, result = targets[0]
+        return [with_path(result, bidirectional_search(index, source, target))]
+    parents = breadth_first_tree(index, source, [target for target, _ in targets])
+    return [with_path(result, path_to(parents, target)) for target, result in targets]
+
+
+def with_path(result, path):
+    """
+    Add the degrees of separation and the (movie_id, person_id) path
+    to `result`, both None if the people are not connected.
+    """
+    index = degrees.index
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [
+            [index.movie_ids[movie], index.person_ids[person]]
+            for movie, person in path
+        ]
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import os
+import random
+import time
+
+import degrees
+from util import Node, StackFrontier, QueueFrontier
+
+# Exponent of the power laws for cast sizes and how often a person is cast
+CAST_EXPONENT = 2.0
+POPULARITY_EXPONENT = 0.8
+
+# Largest cast of a synthetic movie
+MAX_CAST = 200
+
+
+class ListStackFrontier():
+    """
+    The original list-backed stack frontier, kept as a baseline.
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+            return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+    """
+    The original list-backed queue frontier, kept as a baseline.
+    """
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+FRONTIERS = {
+    "StackFrontier": (ListStackFrontier, StackFrontier),
+    "QueueFrontier": (ListQueueFrontier, QueueFrontier),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees components.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    frontier = subparsers.add_parser("frontier", help="time frontier operations")
+    frontier.add_argument("--sizes", type=int, nargs="+", default=[10 ** 4, 10 ** 5, 10 ** 6])
+    frontier.add_argument("--operations", type=int, default=100,
+                          help="removes and lookups timed at each size")
+
+    generate = subparsers.add_parser("generate", help="write a synthetic dataset")
+    generate.add_argument("directory")
+    generate.add_argument("--edges", type=int, default=10 ** 5,
+                          help="number of rows in stars.csv")
+    generate.add_argument("--seed", type=int, default=0)
+
+    graph = subparsers.add_parser("graph", help="time loading and searching a dataset")
+    graph.add_argument("directory")
+    graph.add_argument("--queries", type=int, default=20,
+                       help="neighbor lookups, and searches at each distance")
+    graph.add_argument("--seed", type=int, default=0)
+    graph.add_argument("--label", default="",
+                       help="tag for the results, such as a commit")
+
+    args = parser.parse_args()
+    if args.benchmark == "frontier":
+        results = benchmark_frontiers(args.sizes, args.operations)
+    elif args.benchmark == "generate":
+        generate_dataset(args.directory, args.edges, args.seed)
+        results = []
+    else:
+        results = benchmark_graph(args.directory, args.queries, args.seed)
+    for result in results:
+        if args.benchmark == "graph":
+            result["label"] = args.label
+        print(json.dumps(result), flush=True)
+
+
+def benchmark_frontiers(sizes, operations):
+    """
+    Yield timings of `add`, `remove` and `contains_state` for the list-based
+    and deque-based frontiers, holding `size` nodes for each of `sizes`.
+    """
+    for size in sizes:
+        for name, implementations in FRONTIERS.items():
+            for implementation, cls in zip(("list", "deque"), implementations):
+                timings = time_frontier(cls, size, operations)
+                for operation, seconds in timings.items():
+                    yield {
+                        "benchmark": "frontier",
+                        "frontier": name,
+                        "implementation": implementation,
+                        "size": size,
+                        "operation": operation,
+                        "seconds_per_operation": seconds
+                    }
+
+
+def time_frontier(cls, size, operations):
+    """
+    Fill a `cls` frontier with `size` nodes, then time `operations` lookups
+    of a state near the far end and `operations` removes.
+    Returns the mean seconds per add, contains_state and remove.
+    """
+    frontier = cls()
+    start = time.perf_counter()
+    for state in range(size):
+        frontier.add(Node(state, None, None))
+    timings = {"add": (time.perf_counter() - start) / size}
+
+    operations = min(operations, size)
+    start = time.perf_counter()
+    for _ in range(operations):
+        frontier.contains_state(size - 1)
+    timings["contains_state"] = (time.perf_counter() - start) / operations
+
+    start = time.perf_counter()
+    for _ in range(operations):
+        frontier.remove()
+    timings["remove"] = (time.perf_counter() - start) / operations
+    return timings
+
+
+def generate_dataset(directory, edges, seed=0):
+    """
+    Write synthetic people.csv, movies.csv and stars.csv files with
+    `edges` stars rows to `directory`.
+
+    Cast sizes follow a power law, and people are cast with a power-law
+    popularity, so a few people star in many movies and most in few.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    n_people = max(2, edges // 4)
+    cumulative = list(itertools.accumulate(
+        1 / (rank + 1) ** POPULARITY_EXPONENT for rank in range(n_people)
+    ))
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(n_people):
+            writer.writerow([person, f"Person {person}", rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as movies_file, \
+            open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as stars_file:
+        movies_writer = csv.writer(movies_file)
+        stars_writer = csv.writer(stars_file)
+        movies_writer.writerow(["id", "title", "year"])
+        stars_writer.writerow(["person_id", "movie_id"])
+        rows = 0
+        movie = 0
+        while rows < edges:
+            size = min(int(rng.paretovariate(CAST_EXPONENT - 1)), MAX_CAST, n_people, edges - rows)
+            cast = set()
+            while len(cast) < size:
+                cast.add(bisect.bisect_left(cumulative, rng.random() * cumulative[-1]))
+            movies_writer.writerow([movie, f"Movie {movie}", rng.randint(1920, 2020)])
+            for person in cast:
+                stars_writer.writerow([person, movie])
+            rows += size
+            movie += 1
+
+
+def benchmark_graph(directory, queries, seed=0):
+    """
+    Yield timings of `load_data`, `neighbors_for_person` and
+    `shortest_path` on the dataset in `directory`, with searches
+    grouped by degrees of separation.
+    """
+    rng = random.Random(seed)
+    with open(os.path.join(directory, "stars.csv"), encoding="utf-8") as f:
+        stars = sum(1 for _ in f) - 1
+    base = {"benchmark": "graph", "directory": directory, "edges": stars}
+
+    for operation, snapshot in (("load_data", False), ("load_data_snapshot_write", True),
+                                ("load_data_snapshot_read", True)):
+        degrees.names.clear()
+        degrees.people.clear()
+        degrees.movies.clear()
+        if operation == "load_data_snapshot_write":
+            # Start from no snapshot, so earlier runs do not turn this into a read
+            for filename in (degrees.SNAPSHOT_FILE, degrees.INDEX_FILE):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    pass
+        start = time.perf_counter()
+        degrees.load_data(directory, snapshot=snapshot)
+        yield dict(base, operation=operation, seconds=time.perf_counter() - start)
+
+    person_ids = list(degrees.people)
+    sample = [rng.choice(person_ids) for _ in range(queries)]
+    start = time.perf_counter()
+    for person_id in sample:
+        degrees.neighbors_for_person(person_id)
+    yield dict(base, operation="neighbors_for_person",
+               seconds=(time.perf_counter() - start) / queries)
+
+    # Pick query pairs at each distance from the distances of random sources
+    pairs = {}
+    index = degrees.index
+    for source_id in sample:
+        distances = degrees.distances_from(source_id)[0]
+        for person, distance in enumerate(distances):
+            if distance > 0 and len(pairs.setdefault(distance, [])) < queries:
+                pairs[distance].append((source_id, index.person_ids[person]))
+    for distance in sorted(pairs):
+        start = time.perf_counter()
+        for source_id, target_id in pairs[distance]:
+            degrees.shortest_path(source_id, target_id)
+        yield dict(base, operation="shortest_path", distance=distance, queries=len(pairs[distance]),
+                   seconds=(time.perf_counter() - start) / len(pairs[distance]))
+
+
+if __name__ == "__main__":
+    main()
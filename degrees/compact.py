@@ -0,0 +1,261 @@
+import csv
+import sys
+from array import array
+
+from graph import CoStarIndex
+
+# Rows read between checks of the memory limit
+CHUNK_ROWS = 100000
+
+
+class StringTable():
+    """
+    Strings packed into one UTF-8 buffer and looked up by integer index.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, string):
+        """
+        Add `string` to the table and return its index.
+        """
+        self.data += string.encode("utf-8")
+        self.offsets.append(len(self.data))
+        return len(self.offsets) - 2
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        return len(self.data) + self.offsets.itemsize * len(self.offsets)
+
+
+class MemoryBudget():
+    """
+    Rough accounting of the memory a compact load holds, raising
+    MemoryError once it would exceed `limit` bytes (None for no limit).
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.interned = 0
+
+    def intern(self, key):
+        """
+        Account for `key` being kept as a dictionary key.
+        """
+        self.interned += sys.getsizeof(key)
+
+    def check(self, *buffers, extra=0):
+        """
+        Raise MemoryError if `buffers`, the interned keys and `extra`
+        bytes together exceed the limit.
+        """
+        if self.limit is None:
+            return
+        used = self.interned + extra + sum(nbytes(buffer) for buffer in buffers)
+        if used > self.limit:
+            raise MemoryError(
+                f"compact load needs more than {used} bytes, over the limit of {self.limit}"
+            )
+
+
+class CompactData():
+    """
+    People and movies held in string tables and integer arrays rather
+    than dictionaries, with the co-star index built over them.
+
+    People and movies are numbered like the index; a birth or year of
+    0 means it is unknown.
+    """
+
+    def __init__(self, index, names, births, titles, years):
+        self.index = index
+        self.names = names
+        self.births = births
+        self.titles = titles
+        self.years = years
+        # Movie IDs to indices, built on first lookup by ID
+        self.movie_index = None
+
+    def person(self, person):
+        """
+        Returns the name and birth year of person index `person`, like `people`.
+        """
+        return {"name": self.names[person], "birth": year_text(self.births[person])}
+
+    def movie(self, movie):
+        """
+        Returns the title and year of movie index `movie`, like `movies`.
+        """
+        return {"title": self.titles[movie], "year": year_text(self.years[movie])}
+
+    def movie_by_id(self, movie_id):
+        """
+        Returns the title and year of the movie with ID `movie_id`, like
+        `movies[movie_id]`.
+        """
+        if self.movie_index is None:
+            self.movie_index = {
+                movie_id: movie for movie, movie_id in enumerate(self.index.movie_ids)
+            }
+        return self.movie(self.movie_index[movie_id])
+
+
+def load_compact(directory, memory_limit=None):
+    """
+    Stream the CSV files in `directory` into a `CompactData`, raising
+    MemoryError as soon as the loaded data would take more than
+    `memory_limit` bytes.
+    """
+    budget = MemoryBudget(memory_limit)
+
+    # Load people, interning their IDs to integer indices
+    person_ids = StringTable()
+    person_index = {}
+    names = StringTable()
+    births = array("i")
+    for row in read_rows(f"{directory}/people.csv", person_ids, names, births, budget=budget):
+        if row["id"] in person_index:
+            continue
+        person_index[row["id"]] = person_ids.append(row["id"])
+        budget.intern(row["id"])
+        names.append(row["name"])
+        births.append(parse_year(row["birth"]))
+
+    # Load movies
+    movie_ids = StringTable()
+    movie_index = {}
+    titles = StringTable()
+    years = array("i")
+    tables = (person_ids, names, births, movie_ids, titles, years)
+    for row in read_rows(f"{directory}/movies.csv", *tables, budget=budget):
+        if row["id"] in movie_index:
+            continue
+        movie_index[row["id"]] = movie_ids.append(row["id"])
+        budget.intern(row["id"])
+        titles.append(row["title"])
+        years.append(parse_year(row["year"]))
+
+    # Load stars as parallel arrays of movie and person indices
+    star_movies = array("i")
+    star_people = array("i")
+    for row in read_rows(f"{directory}/stars.csv", *tables, star_movies, star_people, budget=budget):
+        person = person_index.get(row["person_id"])
+        movie = movie_index.get(row["movie_id"])
+        if person is not None and movie is not None:
+            star_movies.append(movie)
+            star_people.append(person)
+    del movie_index
+
+    # Group the cast of every movie, dropping repeated stars rows
+    cast_offsets, cast = group_by(star_movies, star_people, len(movie_ids))
+    del star_movies, star_people
+    cast_offsets, cast = deduplicate(cast_offsets, cast)
+
+    # Group the movies of every person
+    cast_movies = array("i")
+    for movie in range(len(movie_ids)):
+        cast_movies.extend([movie] * (cast_offsets[movie + 1] - cast_offsets[movie]))
+    filmography_offsets, filmography = group_by(cast, cast_movies, len(person_ids))
+    del cast_movies
+
+    # Check the co-star edges fit before allocating them
+    edges = sum(
+        size * (size - 1)
+        for size in (cast_offsets[m + 1] - cast_offsets[m] for m in range(len(movie_ids)))
+    )
+    budget.check(
+        *tables, cast_offsets, cast, filmography_offsets, filmography,
+        extra=edges * 8 + (len(person_ids) + 1) * 8
+    )
+
+    offsets = array("q", [0])
+    neighbors = array("i")
+    links = array("i")
+    for person in range(len(person_ids)):
+        for k in range(filmography_offsets[person], filmography_offsets[person + 1]):
+            movie = filmography[k]
+            for j in range(cast_offsets[movie], cast_offsets[movie + 1]):
+                star = cast[j]
+                if star != person:
+                    neighbors.append(star)
+                    links.append(movie)
+        offsets.append(len(neighbors))
+
+    index = CoStarIndex(person_ids, movie_ids, offsets, neighbors, links, person_index)
+    return CompactData(index, names, births, titles, years)
+
+
+def read_rows(filename, *buffers, budget):
+    """
+    Yield the rows of CSV file `filename` as dictionaries, checking every
+    `CHUNK_ROWS` rows that `buffers` still fit in `budget`.
+    """
+    with open(filename, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for number, row in enumerate(reader, 1):
+            yield row
+            if number % CHUNK_ROWS == 0:
+                budget.check(*buffers)
+    budget.check(*buffers)
+
+
+def group_by(keys, values, n_keys):
+    """
+    Counting sort `values` by the parallel integer `keys`.
+    Returns offsets such that the values for key `k` are
+    `grouped[offsets[k]:offsets[k + 1]]`, and the grouped values.
+    """
+    offsets = array("q", [0]) * (n_keys + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for key in range(n_keys):
+        offsets[key + 1] += offsets[key]
+    positions = array("q", offsets)
+    grouped = array("i", [0]) * len(values)
+    for key, value in zip(keys, values):
+        grouped[positions[key]] = value
+        positions[key] += 1
+    return offsets, grouped
+
+
+def deduplicate(offsets, grouped):
+    """
+    Drop repeated values within each group of `group_by` output.
+    """
+    new_offsets = array("q", [0])
+    new_grouped = array("i")
+    for key in range(len(offsets) - 1):
+        new_grouped.extend(dict.fromkeys(grouped[offsets[key]:offsets[key + 1]]))
+        new_offsets.append(len(new_grouped))
+    return new_offsets, new_grouped
+
+
+def nbytes(buffer):
+    """
+    Returns the bytes held by a string table or array.
+    """
+    if isinstance(buffer, StringTable):
+        return buffer.nbytes()
+    return buffer.itemsize * len(buffer)
+
+
+def parse_year(text):
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+def year_text(year):
+    return str(year) if year else ""
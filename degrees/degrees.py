@@ -1,7 +1,15 @@
 import csv
+import heapq
+import os
 import sys
 import time
 
+from compact import load_compact
+from graph import (
+    CoStarIndex, Components, bidirectional_search, shortest_paths, single_source_distances
+)
+from lookup import NameIndex
+from snapshot import read_snapshot, source_signature, write_snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -13,10 +21,74 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact co-star adjacency over people and movies, used by the searches
+index = None
 
-def load_data(directory):
+# Connected components of the co-star index, to rule out unconnected pairs
+components = None
+
+# People and movies loaded by `load_compact_data` instead of the dictionaries
+catalog = None
+
+# Sorted and trigram index over person names, built on first lookup
+name_index = None
+
+# Files written next to the CSV files to skip parsing them on later runs
+SNAPSHOT_FILE = "degrees.snapshot"
+INDEX_FILE = "degrees.index"
+
+
+def load_data(directory, snapshot=True):
     """
     Load data from CSV files into memory.
+
+    Unless `snapshot` is False, the loaded data is also written to a
+    binary snapshot next to the CSV files, and later calls load that
+    snapshot instead of parsing the CSV files while they are unchanged.
+    """
+    snapshot_file = os.path.join(directory, SNAPSHOT_FILE)
+    index_file = os.path.join(directory, INDEX_FILE)
+    if snapshot:
+        signature = source_signature(directory)
+        data = read_snapshot(snapshot_file, signature)
+        if data is not None:
+            names.update(data["names"])
+            people.update(data["people"])
+            movies.update(data["movies"])
+            try:
+                loaded = CoStarIndex.load(index_file)
+            except (OSError, ValueError):
+                loaded = None
+            # Only trust an index built from the same files as the snapshot
+            if loaded is not None and loaded.source == repr(signature) and len(loaded) == len(people):
+                use_index(loaded)
+            else:
+                build_index()
+                try:
+                    index.save(index_file, repr(signature))
+                except OSError:
+                    pass
+            return
+
+    load_csv(directory)
+    build_index()
+
+    if snapshot:
+        try:
+            index.save(index_file, repr(signature))
+            write_snapshot(snapshot_file, signature, {
+                "names": names,
+                "people": people,
+                "movies": movies
+            })
+        except OSError:
+            # A read-only data directory just means no snapshot next time
+            pass
+
+
+def load_csv(directory):
+    """
+    Parse the people, movies and stars CSV files in `directory`.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
@@ -53,6 +125,38 @@ def load_data(directory):
                 pass
 
 
+def load_compact_data(directory, memory_limit=None):
+    """
+    Stream the CSV files into compact arrays and string tables, kept in
+    `catalog`, instead of the `names`, `people` and `movies` dictionaries.
+
+    Raises MemoryError if that would take more than `memory_limit` bytes.
+    """
+    global catalog
+    catalog = load_compact(directory, memory_limit)
+    use_index(catalog.index)
+
+
+def build_index():
+    """
+    Rebuild the co-star index from the loaded people and movies.
+    """
+    use_index(CoStarIndex.from_graph(people, movies))
+
+
+def use_index(new_index):
+    """
+    Search `new_index` from now on, labelling its connected components
+    unless they were loaded with it.
+    """
+    global index, components, name_index
+    index = new_index
+    if index.components is None:
+        index.components = Components(index)
+    components = index.components
+    name_index = None
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -92,33 +196,73 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
-    pathes = []
-    persons = [source]
-    neighbour_list= neighbors_for_person(source)
-    for neighbour in neighbour_list:
-        if neighbour[1] not in persons:
-            pathes.append([neighbour])
-            persons.append(neighbour[1])
-        for path in pathes:
-            if path[0][1] == target:
-                return path
-    while True:
-        new_pathes = []
-        for path in pathes:
-            source = path[-1][1]
-            neighbour_list= neighbors_for_person(source)
-            for neighbour in neighbour_list:
-                if neighbour[1] not in persons:
-                    new_path = path[:]
-                    new_path.append(neighbour)
-                    new_pathes.append(new_path)
-                    persons.append(neighbour[1])
-        for new_path in new_pathes:
-            if new_path[-1][1] == target:
-                return new_path
-        pathes = new_pathes
+    if index is None:
+        build_index()
+    source = index.person_index[source]
+    target = index.person_index[target]
+    if not components.connected(source, target):
+        return None
+    path = bidirectional_search(index, source, target)
+    if path is None:
+        return None
+    return [
+        (index.movie_ids[movie], index.person_ids[person])
+        for movie, person in path
+    ]
+
+
+def all_shortest_paths(source, target):
+    """
+    Yield every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, one at a time.
+    """
+    if index is None:
+        build_index()
+    source = index.person_index[source]
+    target = index.person_index[target]
+    if not components.connected(source, target):
+        return
+    for path in shortest_paths(index, source, target):
+        yield [
+            (index.movie_ids[movie], index.person_ids[person])
+            for movie, person in path
+        ]
+
+
+def top_shortest_paths(source, target, k, key=None):
+    """
+    Returns the `k` best shortest paths from the source to the target
+    by `key`, a function of a path that is larger for better paths.
+
+    By default, paths through more recent movies rank first.
+    """
+    if key is None:
+        key = recency
+    return heapq.nlargest(k, all_shortest_paths(source, target), key=key)
+
+
+def recency(path):
+    """
+    Returns the years of the movies along `path`, most recent first, so
+    paths compare by their most recent movie, then the next, and so on.
+    """
+    if catalog is not None and catalog.index is index:
+        years = [catalog.movie_by_id(movie_id)["year"] for movie_id, _ in path]
+    else:
+        years = [movies[movie_id]["year"] for movie_id, _ in path]
+    return sorted((int(year) if year else 0 for year in years), reverse=True)
 
 
+def distances_from(source):
+    """
+    Returns the degrees of separation from `source` to every person,
+    with parent pointers for the shortest paths, as arrays indexed
+    like `index.person_ids`. See `graph.single_source_distances`.
+    """
+    if index is None:
+        build_index()
+    return single_source_distances(index, index.person_index[source])
+
 
 def person_id_for_name(name):
     """
@@ -146,6 +290,28 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def find_people(query, limit=10):
+    """
+    Returns up to `limit` people matching `query` by exact name, name
+    prefix or approximate name, best first, without asking for input.
+    Each is a dictionary of id, name, birth and a score from 0 to 1.
+    """
+    return get_name_index().search(query, limit)
+
+
+def get_name_index():
+    """
+    Returns the name index over the loaded people, building it if needed.
+    """
+    global name_index
+    if name_index is None:
+        if catalog is not None and catalog.index is index:
+            name_index = NameIndex.from_catalog(catalog)
+        else:
+            name_index = NameIndex.from_people(people)
+    return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
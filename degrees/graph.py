@@ -0,0 +1,512 @@
+import heapq
+import math
+import mmap
+import os
+import struct
+from array import array
+
+# File header: magic, format version, number of people, movies and edges
+HEADER = struct.Struct("<4sIqqq")
+MAGIC = b"DGIX"
+VERSION = 3
+
+
+class CoStarIndex():
+    """
+    Compact co-star graph over integer person indices.
+
+    The co-stars of person `i` are `neighbors[offsets[i]:offsets[i + 1]]`,
+    and `links[k]` is the index of the movie that `neighbors[k]` starred
+    in together with person `i`.
+    """
+
+    def __init__(self, person_ids, movie_ids, offsets, neighbors, links, person_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.links = links
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        self.person_index = person_index
+        # Description of the files the index was built from, if known
+        self.source = ""
+        # Connected components, saved along with the index once labelled
+        self.components = None
+
+    @classmethod
+    def from_graph(cls, people, movies):
+        """
+        Build the index from the `people` and `movies` dictionaries
+        filled in by `load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        offsets = array("q", [0])
+        neighbors = array("i")
+        links = array("i")
+        for person_id in person_ids:
+            for movie_id in people[person_id]["movies"]:
+                movie = movie_index[movie_id]
+                for star_id in movies[movie_id]["stars"]:
+                    if star_id != person_id:
+                        neighbors.append(person_index[star_id])
+                        links.append(movie)
+            offsets.append(len(neighbors))
+        return cls(person_ids, movie_ids, offsets, neighbors, links)
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def co_stars(self, person):
+        """
+        Yield (movie, person) index pairs for everyone who starred
+        with `person`.
+        """
+        for k in range(self.offsets[person], self.offsets[person + 1]):
+            yield self.links[k], self.neighbors[k]
+
+    def save(self, filename, source=""):
+        """
+        Write the index to `filename` in a binary format `load` can map
+        back into memory, tagged with `source`, a description of the
+        files it was built from.
+        """
+        temporary = f"{filename}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION,
+                len(self.person_ids), len(self.movie_ids), len(self.neighbors)
+            ))
+            write_padded(f, source.encode("utf-8"))
+            for ids in (self.person_ids, self.movie_ids):
+                write_padded(f, "\n".join(ids).encode("utf-8"))
+            for values, typecode in ((self.offsets, "q"), (self.neighbors, "i"), (self.links, "i")):
+                write_padded(f, array(typecode, values).tobytes())
+            labels, sizes = (
+                (self.components.labels, self.components.sizes)
+                if self.components is not None else ((), ())
+            )
+            write_padded(f, array("i", labels).tobytes())
+            write_padded(f, array("q", sizes).tobytes())
+        # Replace rather than overwrite, since the old file may still be mapped
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Memory-map an index previously written by `save`, with the
+        `source` it was tagged with and its components, if they were
+        labelled before it was saved.
+
+        Raises ValueError if the file is not an index of this version,
+        or is truncated or corrupt.
+        """
+        with open(filename, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError(f"{filename} is not a co-star index")
+        magic, version, n_people, n_movies, n_edges = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filename} is not a version {VERSION} co-star index")
+
+        source, position = read_padded(view, HEADER.size)
+        id_lists = []
+        for count in (n_people, n_movies):
+            blob, position = read_padded(view, position)
+            ids = bytes(blob).decode("utf-8").split("\n") if count else []
+            id_lists.append(ids)
+        arrays = []
+        for typecode in ("q", "i", "i"):
+            values, position = read_array(view, position, typecode)
+            arrays.append(values)
+        offsets, neighbors, links = arrays
+        if len(offsets) != n_people + 1 or len(neighbors) != n_edges or len(links) != n_edges:
+            raise ValueError(f"{filename} is truncated")
+
+        labels, position = read_array(view, position, "i")
+        sizes, position = read_array(view, position, "q")
+
+        index = cls(id_lists[0], id_lists[1], offsets, neighbors, links)
+        index.source = bytes(source).decode("utf-8")
+        if len(labels) == n_people:
+            index.components = Components.from_labels(labels, sizes)
+        # Keep the mapping alive for as long as the views into it are used
+        index.buffer = buffer
+        return index
+
+
+def write_padded(f, data):
+    """
+    Write `data` prefixed by its length and padded to a multiple of 8 bytes.
+    """
+    f.write(struct.pack("<q", len(data)))
+    f.write(data)
+    f.write(b"\0" * (-len(data) % 8))
+
+
+def read_padded(view, position):
+    """
+    Read a block written by `write_padded` from `view` at `position`.
+    Returns the block and the position just past it.
+    """
+    if position + 8 > len(view):
+        raise ValueError("co-star index is truncated")
+    (length,) = struct.unpack_from("<q", view, position)
+    start = position + 8
+    end = start + length
+    if length < 0 or end > len(view):
+        raise ValueError("co-star index is truncated")
+    return view[start:end], end + (-length % 8)
+
+
+def read_array(view, position, typecode):
+    """
+    Read a block written by `write_padded` as an array of `typecode`.
+    Returns the array and the position just past it.
+    """
+    blob, position = read_padded(view, position)
+    if len(blob) % array(typecode).itemsize:
+        raise ValueError("co-star index is corrupt")
+    return blob.cast(typecode), position
+
+
+def bidirectional_search(index, source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs that
+    connect `source` to `target` in `index`, or None if they are
+    not connected.
+
+    Searches breadth-first from both ends at the same time, always
+    growing the smaller frontier, until the two searches meet.
+    """
+    if source == target:
+        return []
+
+    # Each side maps every person it reached to the (movie, person)
+    # step leading back towards where that side started
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_level(index, forward_frontier, forward, backward)
+        else:
+            backward_frontier, meeting = expand_level(index, backward_frontier, backward, forward)
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    return None
+
+
+def expand_level(index, frontier, parents, other_parents):
+    """
+    Expands every person in `frontier` by one step, recording parent
+    pointers in `parents`.
+
+    Returns the next frontier and the person where this level met the
+    other search on the shortest combined path, or None if they did not meet.
+    """
+    offsets, neighbors, links = index.offsets, index.neighbors, index.links
+    next_frontier = []
+    meeting = None
+    meeting_length = None
+    for person in frontier:
+        for k in range(offsets[person], offsets[person + 1]):
+            neighbor = neighbors[k]
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (links[k], person)
+            next_frontier.append(neighbor)
+            if neighbor in other_parents:
+                length = steps_to_origin(neighbor, other_parents)
+                if meeting is None or length < meeting_length:
+                    meeting = neighbor
+                    meeting_length = length
+    return next_frontier, meeting
+
+
+def steps_to_origin(person, parents):
+    """
+    Returns how many parent pointers separate `person` from the
+    person a search started from.
+    """
+    steps = 0
+    while parents[person] is not None:
+        person = parents[person][1]
+        steps += 1
+    return steps
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie, person) path from the source to the target
+    through the person where the two searches met.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, previous = forward[person]
+        path.append((movie, person))
+        person = previous
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, following = backward[person]
+        path.append((movie, following))
+        person = following
+    return path
+
+
+def breadth_first_tree(index, source, targets=None):
+    """
+    Search breadth-first from `source` and return the parent pointers
+    of every person reached, mapping each to the (movie, person) step
+    leading back towards `source`.
+
+    If `targets` is given, the search stops as soon as all of them
+    have been reached.
+    """
+    offsets, neighbors, links = index.offsets, index.neighbors, index.links
+    parents = {source: None}
+    frontier = [source]
+    remaining = None if targets is None else set(targets) - {source}
+    while frontier and (remaining is None or remaining):
+        next_frontier = []
+        for person in frontier:
+            for k in range(offsets[person], offsets[person + 1]):
+                neighbor = neighbors[k]
+                if neighbor not in parents:
+                    parents[neighbor] = (links[k], person)
+                    next_frontier.append(neighbor)
+                    if remaining is not None:
+                        remaining.discard(neighbor)
+        frontier = next_frontier
+    return parents
+
+
+def path_to(parents, target):
+    """
+    Returns the (movie, person) path from the root of a breadth-first
+    tree to `target`, or None if the tree did not reach `target`.
+    """
+    if target not in parents:
+        return None
+    path = []
+    person = target
+    while parents[person] is not None:
+        movie, previous = parents[person]
+        path.append((movie, person))
+        person = previous
+    path.reverse()
+    return path
+
+
+class Components():
+    """
+    Connected components of a co-star index, labelled by depth-first search.
+
+    `labels[i]` is the component of person `i`, and `sizes[c]` the number
+    of people in component `c`; components are numbered in order of their
+    lowest person index.
+    """
+
+    def __init__(self, index):
+        offsets, neighbors = index.offsets, index.neighbors
+        self.labels = array("i", [-1]) * len(index)
+        self.sizes = array("q")
+        for root in range(len(index)):
+            if self.labels[root] != -1:
+                continue
+            label = len(self.sizes)
+            self.labels[root] = label
+            size = 1
+            frontier = [root]
+            while frontier:
+                person = frontier.pop()
+                for k in range(offsets[person], offsets[person + 1]):
+                    neighbor = neighbors[k]
+                    if self.labels[neighbor] == -1:
+                        self.labels[neighbor] = label
+                        size += 1
+                        frontier.append(neighbor)
+            self.sizes.append(size)
+
+    @classmethod
+    def from_labels(cls, labels, sizes):
+        """
+        Return the components with the given `labels` and `sizes`,
+        without labelling an index again.
+        """
+        components = cls.__new__(cls)
+        components.labels = labels
+        components.sizes = sizes
+        return components
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def connected(self, source, target):
+        """
+        Returns True if people `source` and `target` are in the same component.
+        """
+        return self.labels[source] == self.labels[target]
+
+    def size_of(self, person):
+        """
+        Returns the number of people in the component of `person`.
+        """
+        return self.sizes[self.labels[person]]
+
+
+def single_source_distances(index, source):
+    """
+    Search breadth-first from `source` over the whole graph.
+
+    Returns three arrays indexed by person: the degrees of separation
+    from `source` (-1 if unreachable), and the person and movie of the
+    step leading back towards `source` (-1 for `source` and the
+    unreachable).
+    """
+    offsets, neighbors, links = index.offsets, index.neighbors, index.links
+    distances = array("i", [-1]) * len(index)
+    parents = array("i", [-1]) * len(index)
+    parent_links = array("i", [-1]) * len(index)
+    distances[source] = 0
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for person in frontier:
+            for k in range(offsets[person], offsets[person + 1]):
+                neighbor = neighbors[k]
+                if distances[neighbor] == -1:
+                    distances[neighbor] = distance
+                    parents[neighbor] = person
+                    parent_links[neighbor] = links[k]
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances, parents, parent_links
+
+
+class LandmarkOracle():
+    """
+    Bounds on degrees of separation from precomputed distances to a few
+    landmark people, by the triangle inequality.
+    """
+
+    def __init__(self, index, landmarks):
+        self.landmarks = list(landmarks)
+        self.distances = [
+            single_source_distances(index, landmark)[0]
+            for landmark in self.landmarks
+        ]
+
+    @classmethod
+    def most_connected(cls, index, k):
+        """
+        Build an oracle whose landmarks are the `k` people with the
+        most co-star edges.
+        """
+        offsets = index.offsets
+        landmarks = heapq.nlargest(
+            k, range(len(index)), key=lambda person: offsets[person + 1] - offsets[person]
+        )
+        return cls(index, landmarks)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        `source` and `target`.
+
+        `upper` is math.inf if no landmark reaches both people, and both
+        are math.inf if a landmark proves they are not connected.
+        """
+        lower = 0
+        upper = math.inf
+        for distances in self.distances:
+            to_source = distances[source]
+            to_target = distances[target]
+            if to_source == -1 and to_target == -1:
+                continue
+            if to_source == -1 or to_target == -1:
+                return math.inf, math.inf
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return lower, upper
+
+
+def shortest_path_dag(index, source, target):
+    """
+    Search breadth-first from `source` up to the level of `target`,
+    keeping every (movie, person) step that lies on a shortest path
+    from `source`.
+
+    Returns a dictionary mapping each person reached to all of its
+    steps back towards `source`, or None if `target` is not reachable.
+    """
+    offsets, neighbors, links = index.offsets, index.neighbors, index.links
+    distances = {source: 0}
+    predecessors = {source: []}
+    frontier = [source]
+    while frontier and target not in distances:
+        next_frontier = []
+        for person in frontier:
+            distance = distances[person] + 1
+            for k in range(offsets[person], offsets[person + 1]):
+                neighbor = neighbors[k]
+                neighbor_distance = distances.get(neighbor)
+                if neighbor_distance is None:
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = [(links[k], person)]
+                    next_frontier.append(neighbor)
+                elif neighbor_distance == distance:
+                    predecessors[neighbor].append((links[k], person))
+        frontier = next_frontier
+    if target not in distances:
+        return None
+    return predecessors
+
+
+def shortest_paths(index, source, target):
+    """
+    Yield every shortest list of (movie, person) index pairs from
+    `source` to `target`, one at a time, from a single breadth-first
+    search. Yields nothing if they are not connected.
+    """
+    predecessors = shortest_path_dag(index, source, target)
+    if predecessors is None:
+        return
+    if source == target:
+        yield []
+        return
+
+    # Walk back from the target depth-first, holding one path at a time
+    path = []
+    people = [target]
+    steps = [iter(predecessors[target])]
+    while steps:
+        step = next(steps[-1], None)
+        if step is None:
+            steps.pop()
+            people.pop()
+            if path:
+                path.pop()
+            continue
+        movie, previous = step
+        path.append((movie, people[-1]))
+        if previous == source:
+            yield path[::-1]
+            path.pop()
+        else:
+            people.append(previous)
+            steps.append(iter(predecessors[previous]))
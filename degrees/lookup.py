@@ -0,0 +1,176 @@
+import bisect
+import heapq
+from array import array
+
+
+class NameIndex():
+    """
+    Person names sorted for exact and prefix lookups with bisect, plus a
+    trigram index, built on first use, for approximate lookups.
+    """
+
+    def __init__(self, entries):
+        """
+        Index `entries`, an iterable of (person_id, name, birth) triples.
+        """
+        rows = sorted(
+            (normalize(name), person_id, name, birth)
+            for person_id, name, birth in entries
+        )
+        self.keys = [row[0] for row in rows]
+        self.person_ids = [row[1] for row in rows]
+        self.names = [row[2] for row in rows]
+        self.births = [row[3] for row in rows]
+        self.trigrams = None
+        self.trigram_counts = None
+        self.lengths = None
+
+    @classmethod
+    def from_people(cls, people):
+        """
+        Index the `people` dictionary filled in by `load_data`.
+        """
+        return cls(
+            (person_id, person["name"], person["birth"])
+            for person_id, person in people.items()
+        )
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """
+        Index the people of a `compact.CompactData`.
+        """
+        return cls(
+            (person_id, *catalog.person(person).values())
+            for person, person_id in enumerate(catalog.index.person_ids)
+        )
+
+    def exact(self, name):
+        """
+        Returns the IDs of everyone named `name`, ignoring case.
+        """
+        key = normalize(name)
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_right(self.keys, key, start)
+        return self.person_ids[start:end]
+
+    def prefix_range(self, prefix):
+        """
+        Returns the range of positions whose names start with `prefix`.
+        """
+        key = normalize(prefix)
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\U0010ffff", start)
+        return range(start, end)
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` candidates for `query`, best first.
+
+        Exact matches score 1, names starting with `query` score by how
+        much of the name it covers, and other names by the trigrams they
+        share with it. Each candidate is a dictionary of id, name, birth
+        and score.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        scores = {
+            position: len(key) / len(self.keys[position])
+            for position in self.shortest_with_prefix(key, limit)
+        }
+        if len(scores) < limit:
+            for position, score in self.similar(key).items():
+                if position not in scores:
+                    # Approximate matches always rank below prefix matches
+                    scores[position] = score * 0.5
+        best = heapq.nsmallest(
+            limit, scores.items(), key=lambda item: (-item[1], self.keys[item[0]], item[0])
+        )
+        return [
+            {
+                "id": self.person_ids[position],
+                "name": self.names[position],
+                "birth": self.births[position],
+                "score": round(score, 4)
+            }
+            for position, score in best
+        ]
+
+    def shortest_with_prefix(self, key, limit):
+        """
+        Returns the positions of up to `limit` of the shortest names
+        starting with `key`, shortest first, then in sorted order.
+
+        Names are grouped by length, so only as many names are looked at
+        as are returned, however many share the prefix.
+        """
+        if self.lengths is None:
+            self.build_lengths()
+        found = []
+        for length in sorted(self.lengths):
+            if length < len(key):
+                continue
+            keys, positions = self.lengths[length]
+            start = bisect.bisect_left(keys, key)
+            end = bisect.bisect_left(keys, key + "\U0010ffff", start)
+            found.extend(positions[start:min(end, start + limit - len(found))])
+            if len(found) == limit:
+                break
+        return found
+
+    def build_lengths(self):
+        """
+        Group the sorted names by length, keeping them sorted in each group.
+        """
+        self.lengths = {}
+        for position, key in enumerate(self.keys):
+            group = self.lengths.get(len(key))
+            if group is None:
+                group = self.lengths[len(key)] = ([], array("i"))
+            group[0].append(key)
+            group[1].append(position)
+
+    def similar(self, key):
+        """
+        Returns the Dice similarity of trigrams between `key` and every
+        name sharing at least one trigram with it, by position.
+        """
+        if self.trigrams is None:
+            self.build_trigrams()
+        query = set(trigrams(key))
+        shared = {}
+        for trigram in query:
+            for position in self.trigrams.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        return {
+            position: 2 * count / (len(query) + self.trigram_counts[position])
+            for position, count in shared.items()
+        }
+
+    def build_trigrams(self):
+        """
+        Map every trigram to the positions of the names containing it.
+        """
+        self.trigrams = {}
+        self.trigram_counts = array("i")
+        for position, key in enumerate(self.keys):
+            unique = set(trigrams(key))
+            self.trigram_counts.append(len(unique))
+            for trigram in unique:
+                postings = self.trigrams.get(trigram)
+                if postings is None:
+                    postings = self.trigrams[trigram] = array("i")
+                postings.append(position)
+
+
+def normalize(name):
+    return " ".join(name.lower().split())
+
+
+def trigrams(key):
+    """
+    Returns the trigrams of `key`, padded so word edges count.
+    """
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
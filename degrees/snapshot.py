@@ -0,0 +1,47 @@
+import os
+import pickle
+
+# Bump whenever the layout of the pickled data changes
+VERSION = 1
+
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def source_signature(directory):
+    """
+    Return the size and modification time of every CSV file in `directory`,
+    so a snapshot can tell whether it was built from the same files.
+    """
+    signature = []
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        signature.append((filename, stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def read_snapshot(filename, signature):
+    """
+    Return the data stored in snapshot `filename`, or None if there is no
+    snapshot or it is from another version or other source files.
+    """
+    try:
+        with open(filename, "rb") as f:
+            header = pickle.load(f)
+            if header != {"version": VERSION, "signature": signature}:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def write_snapshot(filename, signature, data):
+    """
+    Write `data` to snapshot `filename`, tagged with the current version
+    and `signature`. The file is replaced atomically, so readers never see
+    a partial snapshot.
+    """
+    temporary = f"{filename}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump({"version": VERSION, "signature": signature}, f)
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, filename)
@@ -0,0 +1,43 @@
+import io
+import os
+
+import batch
+import degrees
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+degrees.load_data(SMALL, snapshot=False)
+
+
+def test_read_queries():
+    f = io.StringIO("Kevin Bacon\tTom Hanks\n\n129\t158\n")
+    assert batch.read_queries(f) == [("Kevin Bacon", "Tom Hanks"), ("129", "158")]
+
+
+def test_answer_queries_shared_source():
+    queries = [("102", "158"), ("Tom Cruise", "Tom Hanks"), ("102", "1697"), ("102", "914612")]
+    results = sorted(batch.answer_queries(queries), key=lambda result: result["query"])
+    assert [result["degrees"] for result in results] == [1, 2, 3, None]
+    assert results[0]["path"] == [["112384", "158"]]
+    assert results[1]["source"] == "129"
+    assert results[3]["path"] is None
+
+
+def test_answer_queries_unknown_person():
+    results = list(batch.answer_queries([("Nobody", "Tom Hanks")]))
+    assert results == [{
+        "query": 0,
+        "source": "Nobody",
+        "target": "Tom Hanks",
+        "error": "Person not found: Nobody"
+    }]
+
+
+def test_answer_queries_parallel_matches_serial():
+    queries = [
+        (source, target)
+        for source in ("102", "129", "163", "914612")
+        for target in ("158", "1697", "705")
+    ]
+    serial = sorted(batch.answer_queries(queries), key=lambda result: result["query"])
+    parallel = sorted(batch.answer_queries(queries, workers=3), key=lambda result: result["query"])
+    assert parallel == serial
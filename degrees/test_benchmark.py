@@ -0,0 +1,52 @@
+import csv
+import os
+
+import benchmark
+from compact import load_compact
+
+
+def read_csv(directory, filename):
+    with open(directory / filename, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_generate_dataset(tmp_path):
+    benchmark.generate_dataset(tmp_path, 1000, seed=1)
+    people = {row["id"] for row in read_csv(tmp_path, "people.csv")}
+    movies = {row["id"] for row in read_csv(tmp_path, "movies.csv")}
+    stars = read_csv(tmp_path, "stars.csv")
+    assert len(stars) == 1000
+    assert len({(row["person_id"], row["movie_id"]) for row in stars}) == 1000
+    assert all(row["person_id"] in people and row["movie_id"] in movies for row in stars)
+
+
+def test_generate_dataset_is_seeded(tmp_path):
+    benchmark.generate_dataset(tmp_path / "a", 500, seed=2)
+    benchmark.generate_dataset(tmp_path / "b", 500, seed=2)
+    assert read_csv(tmp_path / "a", "stars.csv") == read_csv(tmp_path / "b", "stars.csv")
+    assert len(load_compact(tmp_path / "a").index) == 125
+
+
+def test_benchmark_graph_writes_snapshot_every_run(tmp_path, monkeypatch):
+    benchmark.generate_dataset(tmp_path, 300, seed=3)
+    written = []
+    load_data = benchmark.degrees.load_data
+
+    def record(directory, snapshot=True):
+        written.append(os.path.exists(os.path.join(directory, benchmark.degrees.SNAPSHOT_FILE)))
+        load_data(directory, snapshot=snapshot)
+
+    monkeypatch.setattr(benchmark.degrees, "load_data", record)
+    try:
+        for _ in range(2):
+            written.clear()
+            results = list(benchmark.benchmark_graph(str(tmp_path), 2))
+            # Only the write step must start without a snapshot
+            assert written[1:] == [False, True]
+            assert [r["operation"] for r in results[:3]] == [
+                "load_data", "load_data_snapshot_write", "load_data_snapshot_read"
+            ]
+    finally:
+        for data in (benchmark.degrees.names, benchmark.degrees.people, benchmark.degrees.movies):
+            data.clear()
+        load_data(os.path.join(os.path.dirname(os.path.abspath(__file__)), "small"), snapshot=False)
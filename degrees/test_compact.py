@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from compact import StringTable, load_compact
+from graph import CoStarIndex, bidirectional_search
+import degrees
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+
+
+def co_star_ids(index, person_id):
+    return {
+        (index.movie_ids[movie], index.person_ids[person])
+        for movie, person in index.co_stars(index.person_index[person_id])
+    }
+
+
+def test_string_table():
+    table = StringTable()
+    assert table.append("Kevin Bacon") == 0
+    assert table.append("") == 1
+    assert table.append("Penélope Cruz") == 2
+    assert list(table) == ["Kevin Bacon", "", "Penélope Cruz"]
+    assert len(table) == 3
+
+
+def test_load_compact_matches_load_data():
+    degrees.load_data(SMALL, snapshot=False)
+    expected = CoStarIndex.from_graph(degrees.people, degrees.movies)
+    data = load_compact(SMALL)
+    assert sorted(data.index.person_ids) == sorted(expected.person_ids)
+    for person_id in degrees.people:
+        assert co_star_ids(data.index, person_id) == co_star_ids(expected, person_id)
+        person = data.index.person_index[person_id]
+        assert data.person(person) == {
+            "name": degrees.people[person_id]["name"],
+            "birth": degrees.people[person_id]["birth"]
+        }
+
+
+def test_load_compact_search():
+    data = load_compact(SMALL)
+    index = data.index
+    path = bidirectional_search(index, index.person_index["163"], index.person_index["1697"])
+    assert len(path) == 5
+    assert data.movie(path[-1][0])["title"] == "The Princess Bride"
+
+
+def test_load_compact_memory_limit():
+    with pytest.raises(MemoryError):
+        load_compact(SMALL, memory_limit=100)
+
+
+def test_top_shortest_paths_compact():
+    degrees.load_data(SMALL, snapshot=False)
+    expected = degrees.top_shortest_paths("163", "1697", 2)
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    try:
+        degrees.load_compact_data(SMALL)
+        best = degrees.top_shortest_paths("163", "1697", 2)
+        # Paths tied on recency may come in either order
+        assert [degrees.recency(path) for path in best] == [degrees.recency(path) for path in expected]
+        assert all(path in list(degrees.all_shortest_paths("163", "1697")) for path in best)
+    finally:
+        degrees.load_data(SMALL, snapshot=False)
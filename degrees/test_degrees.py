@@ -0,0 +1,213 @@
+import math
+import os
+import shutil
+
+import pytest
+
+import degrees
+from graph import LandmarkOracle
+
+SMALL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "small")
+degrees.load_data(SMALL, snapshot=False)
+
+
+def reload(directory, **kwargs):
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.load_data(directory, **kwargs)
+
+
+@pytest.fixture
+def small_copy(tmp_path):
+    directory = tmp_path / "small"
+    shutil.copytree(SMALL, directory)
+    yield str(directory)
+    reload(SMALL, snapshot=False)
+
+
+def assert_valid_path(source, target, path):
+    person_id = source
+    for movie_id, next_id in path:
+        assert person_id in degrees.movies[movie_id]["stars"]
+        assert next_id in degrees.movies[movie_id]["stars"]
+        person_id = next_id
+    assert person_id == target
+
+
+def test_shortest_path_direct():
+    # Kevin Bacon and Tom Hanks both starred in Apollo 13
+    assert degrees.shortest_path("102", "158") == [("112384", "158")]
+
+
+def test_shortest_path_two_degrees():
+    # Tom Cruise to Tom Hanks through Kevin Bacon
+    path = degrees.shortest_path("129", "158")
+    assert len(path) == 2
+    assert_valid_path("129", "158", path)
+
+
+def test_shortest_path_longest():
+    # Dustin Hoffman to Chris Sarandon
+    path = degrees.shortest_path("163", "1697")
+    assert len(path) == 5
+    assert_valid_path("163", "1697", path)
+
+
+def test_shortest_path_same_person():
+    assert degrees.shortest_path("102", "102") == []
+
+
+def test_shortest_path_not_connected():
+    # Emma Watson has no movies in the small dataset
+    assert degrees.shortest_path("102", "914612") is None
+
+
+def test_index_matches_neighbors_for_person():
+    index = degrees.index
+    for person_id in degrees.people:
+        expected = {
+            (movie_id, star_id)
+            for movie_id, star_id in degrees.neighbors_for_person(person_id)
+            if star_id != person_id
+        }
+        actual = {
+            (index.movie_ids[movie], index.person_ids[person])
+            for movie, person in index.co_stars(index.person_index[person_id])
+        }
+        assert actual == expected
+
+
+def test_index_save_and_load(tmp_path):
+    filename = tmp_path / "small.index"
+    degrees.index.save(filename, "source")
+    loaded = degrees.CoStarIndex.load(filename)
+    assert loaded.source == "source"
+    assert loaded.person_ids == degrees.index.person_ids
+    assert loaded.movie_ids == degrees.index.movie_ids
+    assert list(loaded.offsets) == list(degrees.index.offsets)
+    assert list(loaded.neighbors) == list(degrees.index.neighbors)
+    assert list(loaded.links) == list(degrees.index.links)
+    assert list(loaded.components.labels) == list(degrees.components.labels)
+    assert list(loaded.components.sizes) == list(degrees.components.sizes)
+
+
+def test_load_data_writes_and_uses_snapshot(small_copy):
+    reload(small_copy)
+    assert os.path.exists(os.path.join(small_copy, degrees.SNAPSHOT_FILE))
+    assert os.path.exists(os.path.join(small_copy, degrees.INDEX_FILE))
+    expected = dict(degrees.people)
+
+    reload(small_copy)
+    assert degrees.people == expected
+    assert degrees.shortest_path("129", "158") is not None
+    # Components are loaded from the index rather than labelled again
+    assert isinstance(degrees.components.labels, memoryview)
+
+
+def test_load_rejects_truncated_index(tmp_path):
+    filename = tmp_path / "small.index"
+    degrees.index.save(filename)
+    data = filename.read_bytes()
+    for size in (0, 10, 33, 48, len(data) // 2, len(data) - 1):
+        filename.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            degrees.CoStarIndex.load(filename)
+
+
+def test_load_data_rebuilds_truncated_index(small_copy):
+    reload(small_copy)
+    expected = degrees.shortest_path("129", "158")
+    index_file = os.path.join(small_copy, degrees.INDEX_FILE)
+    with open(index_file, "r+b") as f:
+        f.truncate(33)
+    reload(small_copy)
+    assert degrees.shortest_path("129", "158") == expected
+
+
+def test_load_data_ignores_index_from_other_files(small_copy):
+    reload(small_copy)
+    index_file = os.path.join(small_copy, degrees.INDEX_FILE)
+    expected = degrees.shortest_path("129", "158")
+
+    # An index of the same size built from other files must not be used
+    stale = degrees.CoStarIndex(
+        degrees.index.person_ids, degrees.index.movie_ids,
+        [0] * (len(degrees.index) + 1), [], []
+    )
+    stale.save(index_file, "other files")
+    reload(small_copy)
+    assert degrees.shortest_path("129", "158") == expected
+
+
+def test_load_data_ignores_stale_snapshot(small_copy):
+    reload(small_copy)
+    with open(os.path.join(small_copy, "people.csv"), "a", encoding="utf-8") as f:
+        f.write('1,"New Person",2000\n')
+
+    reload(small_copy)
+    assert degrees.people["1"]["name"] == "New Person"
+    assert len(degrees.index) == len(degrees.people)
+
+
+def test_distances_from_matches_shortest_path():
+    index = degrees.index
+    distances, parents, links = degrees.distances_from("163")
+    for person_id in degrees.people:
+        path = degrees.shortest_path("163", person_id)
+        person = index.person_index[person_id]
+        assert distances[person] == (-1 if path is None else len(path))
+    assert parents[index.person_index["163"]] == -1
+    assert parents[index.person_index["129"]] == index.person_index["163"]
+    assert index.movie_ids[links[index.person_index["129"]]] == "95953"
+
+
+def test_landmark_oracle_bounds():
+    index = degrees.index
+    oracle = LandmarkOracle.most_connected(index, 2)
+    for source_id in degrees.people:
+        for target_id in degrees.people:
+            lower, upper = oracle.bounds(index.person_index[source_id], index.person_index[target_id])
+            path = degrees.shortest_path(source_id, target_id)
+            if path is None:
+                assert upper == math.inf
+            else:
+                assert lower <= len(path) <= upper
+
+
+def test_components():
+    index = degrees.index
+    components = degrees.components
+    # Everyone but Emma Watson, who has no movies, is connected
+    assert len(components) == 2
+    assert sorted(components.sizes) == [1, len(degrees.people) - 1]
+    assert components.size_of(index.person_index["914612"]) == 1
+    assert components.connected(index.person_index["163"], index.person_index["1697"])
+    assert not components.connected(index.person_index["163"], index.person_index["914612"])
+
+
+def test_find_people():
+    results = degrees.find_people("Tom", limit=2)
+    assert {result["id"] for result in results} == {"129", "158"}
+    assert degrees.find_people("Tom Hanx", limit=1)[0]["id"] == "158"
+
+
+def test_all_shortest_paths():
+    paths = list(degrees.all_shortest_paths("163", "1697"))
+    # Dustin Hoffman to Chris Sarandon through Tom Cruise, Kevin Bacon and
+    # either Tom Hanks or Gary Sinise, then Robin Wright
+    assert len(paths) == 2
+    for path in paths:
+        assert len(path) == 5
+        assert_valid_path("163", "1697", path)
+    assert len({tuple(path) for path in paths}) == 2
+
+
+def test_all_shortest_paths_not_connected():
+    assert list(degrees.all_shortest_paths("102", "914612")) == []
+
+
+def test_top_shortest_paths_by_recency():
+    best = degrees.top_shortest_paths("163", "1697", 1)
+    assert len(best) == 1
+    assert best[0] == max(degrees.all_shortest_paths("163", "1697"), key=degrees.recency)
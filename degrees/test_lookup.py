@@ -0,0 +1,42 @@
+from lookup import NameIndex
+
+ENTRIES = [
+    ("102", "Kevin Bacon", "1958"),
+    ("129", "Tom Cruise", "1962"),
+    ("158", "Tom Hanks", "1956"),
+    ("1", "Tom Hanks", "1977"),
+    ("163", "Dustin Hoffman", "1937"),
+]
+
+
+def test_exact_ignores_case():
+    index = NameIndex(ENTRIES)
+    assert sorted(index.exact("tom hanks")) == ["1", "158"]
+    assert index.exact("Tom") == []
+
+
+def test_search_prefix():
+    index = NameIndex(ENTRIES)
+    results = index.search("Tom", limit=3)
+    assert [result["name"] for result in results] == ["Tom Hanks", "Tom Hanks", "Tom Cruise"]
+
+
+def test_search_exact_first():
+    index = NameIndex(ENTRIES)
+    results = index.search("kevin bacon")
+    assert results[0] == {"id": "102", "name": "Kevin Bacon", "birth": "1958", "score": 1.0}
+
+
+def test_search_fuzzy():
+    index = NameIndex(ENTRIES)
+    results = index.search("Dustn Hofman", limit=1)
+    assert results[0]["id"] == "163"
+    assert 0 < results[0]["score"] < 1
+
+
+def test_search_prefers_short_names_however_many_share_the_prefix():
+    entries = [(str(i), f"Ta{i:06d}", "") for i in range(20000)] + [("ty", "Ty", "")]
+    index = NameIndex(entries)
+    results = index.search("t", limit=2)
+    assert [result["name"] for result in results] == ["Ty", "Ta000000"]
+    assert [result["score"] for result in results] == [0.5, 0.125]
@@ -0,0 +1,36 @@
+import pytest
+
+from util import Node, StackFrontier, QueueFrontier
+
+
+def fill(frontier, states):
+    for state in states:
+        frontier.add(Node(state, None, None))
+    return frontier
+
+
+def test_stack_frontier_order():
+    frontier = fill(StackFrontier(), [1, 2, 3])
+    assert [frontier.remove().state for _ in range(3)] == [3, 2, 1]
+    assert frontier.empty()
+
+
+def test_queue_frontier_order():
+    frontier = fill(QueueFrontier(), [1, 2, 3])
+    assert [frontier.remove().state for _ in range(3)] == [1, 2, 3]
+    assert frontier.empty()
+
+
+def test_contains_state_with_duplicates():
+    frontier = fill(QueueFrontier(), [1, 2, 1])
+    frontier.remove()
+    assert frontier.contains_state(1)
+    frontier.remove()
+    frontier.remove()
+    assert not frontier.contains_state(1)
+    assert not frontier.contains_state(2)
+
+
+def test_remove_from_empty_frontier():
+    with pytest.raises(Exception):
+        StackFrontier().remove()
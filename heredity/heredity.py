@@ -2,6 +2,8 @@ import csv
 import itertools
 import sys
 
+from inference import infer
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -44,45 +46,9 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
-        person: {
-            "gene": {
-                2: 0,
-                1: 0,
-                0: 0
-            },
-            "trait": {
-                True: 0,
-                False: 0
-            }
-        }
-        for person in people
-    }
-
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
-
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
+    # Compute gene and trait probabilities for each person exactly,
+    # without enumerating every assignment of genes and traits
+    probabilities = infer(people, PROBS)
 
     # Print results
     for person in people:
@@ -179,34 +145,39 @@ def calculate_probability(people, one_gene, two_genes, have_trait, person, indiv
         # Person has 1 gene, two ways this can happen:
         if person in one_gene:
             # First way: gets one from mother
+            from_mother = 1
             if people[person]["mother"] in one_gene:
-                gene_probability *= 0.5
+                from_mother *= 0.5
             elif people[person]["mother"] in two_genes:
-                gene_probability *= 1 - PROBS["mutation"]
+                from_mother *= 1 - PROBS["mutation"]
             else:
-                gene_probability *= PROBS["mutation"]
+                from_mother *= PROBS["mutation"]
             # No gene from father
             if people[person]["father"] in one_gene:
-                gene_probability *= 0.5
+                from_mother *= 0.5
             elif people[person]["father"] in two_genes:
-                gene_probability *= PROBS["mutation"]
+                from_mother *= PROBS["mutation"]
             else:
-                gene_probability *= 1 - PROBS["mutation"]
+                from_mother *= 1 - PROBS["mutation"]
 
             # Second way: gets one from father, but not from mother
+            from_father = 1
             if people[person]["father"] in one_gene:
-                gene_probability *= 0.5
+                from_father *= 0.5
             elif people[person]["father"] in two_genes:
-                gene_probability *= 1 - PROBS["mutation"]
+                from_father *= 1 - PROBS["mutation"]
             else:
-                gene_probability *= PROBS["mutation"]
+                from_father *= PROBS["mutation"]
             # No gene from mother
             if people[person]["mother"] in one_gene:
-                gene_probability *= 0.5
+                from_father *= 0.5
             elif people[person]["mother"] in two_genes:
-                gene_probability *= PROBS["mutation"]
+                from_father *= PROBS["mutation"]
             else:
-                gene_probability *= 1 - PROBS["mutation"]
+                from_father *= 1 - PROBS["mutation"]
+
+            # Either way gives one copy
+            gene_probability = from_mother + from_father
         
             # Person with 1 gene trait probability
             trait_probability = PROBS["trait"][1][True] if person in have_trait else PROBS["trait"][1][False]
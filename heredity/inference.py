@@ -0,0 +1,162 @@
+import numpy as np
+
+# Gene counts a person may have, which index every factor table
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    A table of non-negative values over the gene counts of the people in
+    `variables`, with one axis of length 3 per person, in order.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = np.asarray(table, dtype=np.float64)
+
+    def expand(self, variables):
+        """
+        Return the table broadcast to the axes of `variables`, which
+        must include all of this factor's variables.
+        """
+        own = sorted(self.variables, key=variables.index)
+        table = np.transpose(self.table, [self.variables.index(variable) for variable in own])
+        shape = [len(GENES) if variable in self.variables else 1 for variable in variables]
+        return table.reshape(shape)
+
+    def multiply(self, other):
+        """
+        Return the product of this factor and `other`.
+        """
+        variables = self.variables + tuple(v for v in other.variables if v not in self.variables)
+        return Factor(variables, self.expand(variables) * other.expand(variables))
+
+    def sum_out(self, variable):
+        """
+        Return this factor with `variable` summed out.
+        """
+        axis = self.variables.index(variable)
+        variables = self.variables[:axis] + self.variables[axis + 1:]
+        return Factor(variables, self.table.sum(axis=axis))
+
+
+def infer(people, probs):
+    """
+    Return the gene and trait distributions of everyone in `people`, as
+    loaded by `heredity.load_data`, given the known traits, in the same
+    form as the probabilities `heredity.main` prints.
+
+    The pedigree is a Bayesian network over each person's gene count,
+    with known traits as evidence, and each person's gene distribution
+    is computed exactly by variable elimination. Eliminating people in
+    min-fill order keeps the intermediate factors small, so the cost is
+    polynomial in the number of people for tree-like pedigrees rather
+    than exponential as with enumeration. A person's trait only depends
+    on their genes, so unknown traits follow from the gene distribution.
+    """
+    factors = pedigree_factors(people, probs)
+    order = elimination_order(factors)
+    probabilities = {}
+    for person in people:
+        gene = eliminate(factors, order, person)
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(gene[genes] * probs["trait"][genes][True] for genes in GENES)
+        else:
+            has_trait = 1.0 if trait else 0.0
+        probabilities[person] = {
+            "gene": {genes: gene[genes] for genes in (2, 1, 0)},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
+
+
+def pedigree_factors(people, probs):
+    """
+    Return the factors of the pedigree network: the prior or inheritance
+    probability of each person's genes, and the likelihood of each
+    known trait given the genes.
+    """
+    # Probability of passing the gene on, by number of copies
+    mutation = probs["mutation"]
+    passes = np.array([mutation, 0.5, 1 - mutation])
+
+    factors = []
+    for person, data in people.items():
+        if data["mother"] is None:
+            factors.append(Factor([person], [probs["gene"][genes] for genes in GENES]))
+        else:
+            mother = passes[:, None]
+            father = passes[None, :]
+            child = np.stack([
+                (1 - mother) * (1 - father),
+                mother * (1 - father) + (1 - mother) * father,
+                mother * father
+            ], axis=-1)
+            factors.append(Factor([data["mother"], data["father"], person], child))
+        if data["trait"] is not None:
+            factors.append(Factor(
+                [person], [probs["trait"][genes][data["trait"]] for genes in GENES]
+            ))
+    return factors
+
+
+def elimination_order(factors):
+    """
+    Return the variables of `factors` in greedy min-fill order: each
+    next variable is the one whose elimination would put the fewest new
+    pairs of variables in a factor together.
+    """
+    neighbors = {}
+    for factor in factors:
+        for variable in factor.variables:
+            neighbors.setdefault(variable, set()).update(factor.variables)
+    for variable in neighbors:
+        neighbors[variable].discard(variable)
+
+    order = []
+    while neighbors:
+        variable = min(neighbors, key=lambda v: (fill_in(neighbors, v), v))
+        adjacent = neighbors.pop(variable)
+        for neighbor in adjacent:
+            neighbors[neighbor].discard(variable)
+            neighbors[neighbor].update(adjacent - {neighbor})
+        order.append(variable)
+    return order
+
+
+def fill_in(neighbors, variable):
+    """
+    Return how many pairs of the neighbors of `variable` are not yet
+    neighbors of each other.
+    """
+    adjacent = neighbors[variable]
+    missing = sum(len(adjacent - neighbors[neighbor]) - 1 for neighbor in adjacent)
+    return missing // 2
+
+
+def eliminate(factors, order, query):
+    """
+    Sum every variable but `query` out of the product of `factors`, in
+    `order`, and return the normalized distribution of `query`.
+    """
+    factors = list(factors)
+    for variable in order:
+        if variable == query:
+            continue
+        involved = [factor for factor in factors if variable in factor.variables]
+        factors = [factor for factor in factors if variable not in factor.variables]
+        product = involved[0]
+        for factor in involved[1:]:
+            product = product.multiply(factor)
+        summed = product.sum_out(variable)
+        # Rescale so long products of small probabilities do not underflow
+        largest = summed.table.max()
+        if largest > 0:
+            summed.table /= largest
+        factors.append(summed)
+
+    result = np.ones(len(GENES))
+    for factor in factors:
+        result *= factor.expand((query,)).reshape(len(GENES)) if factor.variables else factor.table
+    return (result / result.sum()).tolist()
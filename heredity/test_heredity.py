@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+import heredity
+from inference import infer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load(name):
+    return heredity.load_data(os.path.join(HERE, "data", name))
+
+
+def enumerate_probabilities(people):
+    """
+    Compute the probabilities by enumerating every assignment of genes
+    and traits, as `heredity.main` used to.
+    """
+    probabilities = {
+        person: {"gene": {2: 0, 1: 0, 0: 0}, "trait": {True: 0, False: 0}}
+        for person in people
+    }
+    names = set(people)
+    for have_trait in heredity.powerset(names):
+        if any(people[person]["trait"] is not None and
+               people[person]["trait"] != (person in have_trait) for person in names):
+            continue
+        for one_gene in heredity.powerset(names):
+            for two_genes in heredity.powerset(names - one_gene):
+                p = heredity.joint_probability(people, one_gene, two_genes, have_trait)
+                heredity.update(probabilities, one_gene, two_genes, have_trait, p)
+    heredity.normalize(probabilities)
+    return probabilities
+
+
+def test_joint_probability():
+    p = heredity.joint_probability(load("family0.csv"), {"Harry"}, {"James"}, {"James"})
+    assert p == pytest.approx(0.0026643247488)
+
+
+@pytest.mark.parametrize("name", ["family0.csv", "family1.csv", "family2.csv"])
+def test_infer_matches_enumeration(name):
+    people = load(name)
+    expected = enumerate_probabilities(people)
+    probabilities = infer(people, heredity.PROBS)
+    for person in people:
+        for field in ("gene", "trait"):
+            assert probabilities[person][field] == pytest.approx(expected[person][field], abs=1e-12)
+
+
+def test_infer_large_pedigree():
+    # Five generations of couples, each with two children who marry
+    # into new families: far too many people to enumerate
+    people = {}
+
+    def add(name, mother=None, father=None, trait=None):
+        people[name] = {"name": name, "mother": mother, "father": father, "trait": trait}
+
+    add("Mother0")
+    add("Father0", trait=True)
+    couples = [("Mother0", "Father0")]
+    for generation in range(1, 6):
+        next_couples = []
+        for i, (mother, father) in enumerate(couples):
+            daughter = f"Daughter{generation}.{i}"
+            son = f"Son{generation}.{i}"
+            add(daughter, mother, father, trait=(i % 2 == 0) if generation % 2 else None)
+            add(son, mother, father)
+            add(f"Husband{generation}.{i}")
+            add(f"Wife{generation}.{i}", trait=False)
+            next_couples += [(daughter, f"Husband{generation}.{i}"), (f"Wife{generation}.{i}", son)]
+        couples = next_couples[:4]
+    assert len(people) > 40
+
+    probabilities = infer(people, heredity.PROBS)
+    for person in people:
+        assert sum(probabilities[person]["gene"].values()) == pytest.approx(1)
+        assert sum(probabilities[person]["trait"].values()) == pytest.approx(1)
+    assert probabilities["Father0"]["gene"][0] < heredity.PROBS["gene"][0]
@@ -0,0 +1,203 @@
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+import pagerank
+from linkgraph import LinkGraph
+
+# Exponent of the power laws for how many links a page has and how
+# often a page is linked to
+LINKS_EXPONENT = 2.0
+POPULARITY_EXPONENT = 0.8
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{name}</title>
+    </head>
+    <body>
+        <h1>{name}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}
+        </ul>
+    </body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pagerank components.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    generate = subparsers.add_parser("generate", help="write a synthetic corpus")
+    generate.add_argument("directory")
+    generate.add_argument("--pages", type=int, default=10 ** 4)
+    generate.add_argument("--links", type=float, default=8,
+                          help="mean number of links out of a page that has any")
+    generate.add_argument("--dangling", type=float, default=0.05,
+                          help="fraction of pages without links")
+    generate.add_argument("--farms", type=int, default=2, help="number of link farms")
+    generate.add_argument("--farm-size", type=int, default=50, help="pages in each link farm")
+    generate.add_argument("--seed", type=int, default=0)
+
+    run = subparsers.add_parser("run", help="time and check the PageRank of a corpus")
+    run.add_argument("directory")
+    run.add_argument("--samples", type=int, default=pagerank.SAMPLES)
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--label", default="",
+                     help="tag for the results, such as a commit")
+
+    args = parser.parse_args()
+    if args.benchmark == "generate":
+        if args.pages < 2:
+            parser.error("--pages must be at least 2")
+        generate_corpus(args.directory, args.pages, args.links, args.dangling,
+                        args.farms, args.farm_size, args.seed)
+        results = []
+    else:
+        results = benchmark_pagerank(args.directory, args.samples, args.workers, args.seed)
+    for result in results:
+        result["label"] = args.label
+        print(json.dumps(result), flush=True)
+
+
+def generate_corpus(directory, pages, mean_links=8, dangling=0.05, farms=2, farm_size=50, seed=0):
+    """
+    Write a synthetic corpus of `pages` HTML pages to `directory`.
+
+    A `dangling` fraction of the pages have no links. The others have a
+    power-law number of links with mean around `mean_links`, to pages
+    chosen with a power-law popularity. The last `farms` groups of
+    `farm_size` pages are link farms: every page in a farm links to all
+    the others and to one promoted page outside it.
+
+    Return the corpus dictionary the pages should crawl to. Raises
+    ValueError for fewer than two pages, which leave nothing to link to.
+    """
+    if pages < 2:
+        raise ValueError("a corpus needs at least two pages")
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    names = [f"page{page}.html" for page in range(pages)]
+    cumulative = list(itertools.accumulate(
+        1 / (rank + 1) ** POPULARITY_EXPONENT for rank in range(pages)
+    ))
+    # Popularity is by rank, so shuffle which pages are popular
+    popular = list(range(pages))
+    rng.shuffle(popular)
+
+    farm_pages = min(farms * farm_size, pages - 1)
+    ordinary = pages - farm_pages
+    corpus = {}
+    for page in range(ordinary):
+        links = set()
+        if rng.random() >= dangling:
+            scale = mean_links * (LINKS_EXPONENT - 1) / LINKS_EXPONENT
+            size = min(int(scale * rng.paretovariate(LINKS_EXPONENT)), pages - 1)
+            while len(links) < max(1, size):
+                link = popular[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+                if link != page:
+                    links.add(link)
+        corpus[names[page]] = {names[link] for link in links}
+
+    for first in range(ordinary, pages, farm_size):
+        farm = range(first, min(first + farm_size, pages))
+        promoted = rng.randrange(ordinary)
+        for page in farm:
+            corpus[names[page]] = {names[link] for link in farm if link != page} | {names[promoted]}
+
+    for name, links in corpus.items():
+        items = "\n".join(
+            f'            <li><a href="{link}">{link[:-5]}</a></li>' for link in sorted(links)
+        )
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(PAGE.format(name=name[:-5], links=items))
+    return corpus
+
+
+def exact_pagerank(corpus, damping_factor):
+    """
+    Return the PageRank values of `corpus` as a dictionary, solved
+    directly as a sparse linear system rather than iterated.
+
+    The ranks are proportional to the solution `y` of
+    `(I - d P) y = 1`, where `P` passes rank along the links, since the
+    teleport and dangling pages add the same amount to every page.
+    """
+    # Only the reference solve needs SciPy, not generating or crawling
+    import scipy.sparse
+    import scipy.sparse.linalg
+
+    graph = LinkGraph.from_corpus(corpus)
+    n = len(graph)
+    links = scipy.sparse.csr_matrix(
+        (graph.link_share[graph.sources], (graph.targets, graph.sources)), shape=(n, n)
+    )
+    system = scipy.sparse.identity(n, format="csc") - damping_factor * links.tocsc()
+    # Ordering by the pattern of A + A^T keeps the fill-in of the
+    # factorization down on link graphs, where many links go both ways
+    y = scipy.sparse.linalg.spsolve(system, np.ones(n), permc_spec="MMD_AT_PLUS_A")
+    return graph.to_dict(y / y.sum())
+
+
+def measure(function, *args, **kwargs):
+    """
+    Call `function` once to time it and again under tracemalloc for its
+    peak memory, since tracing slows it down.
+    Returns its result, the seconds it took and the peak bytes allocated.
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        function(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def l1_error(ranks, exact):
+    return sum(abs(ranks[page] - exact[page]) for page in exact)
+
+
+def benchmark_pagerank(directory, samples, workers=1, seed=0):
+    """
+    Yield the time and peak memory of `crawl`, `sample_pagerank` and
+    `iterate_pagerank` on the corpus in `directory`, with the L1 error
+    of each estimate against the exact PageRank values.
+    """
+    corpus, seconds, memory = measure(pagerank.crawl, directory, workers)
+    links = sum(len(page_links) for page_links in corpus.values())
+    base = {"benchmark": "pagerank", "directory": directory, "pages": len(corpus), "links": links}
+    yield dict(base, operation="crawl", workers=workers, seconds=seconds, memory=memory)
+
+    exact, seconds, memory = measure(exact_pagerank, corpus, pagerank.DAMPING)
+    yield dict(base, operation="exact_pagerank", seconds=seconds, memory=memory)
+
+    for operation, function, kwargs in (
+        ("sample_pagerank", pagerank.sample_pagerank,
+         {"n": samples, "workers": workers, "seed": seed}),
+        ("batch_sample_pagerank", pagerank.batch_sample_pagerank, {"n": samples, "seed": seed}),
+        ("iterate_pagerank", pagerank.iterate_pagerank, {}),
+    ):
+        ranks, seconds, memory = measure(function, corpus, pagerank.DAMPING, **kwargs)
+        yield dict(base, operation=operation, seconds=seconds, memory=memory,
+                   l1_error=l1_error(ranks, exact), **{
+                       key: value for key, value in kwargs.items() if key in ("n", "workers")
+                   })
+
+
+if __name__ == "__main__":
+    main()
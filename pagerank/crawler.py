@@ -0,0 +1,73 @@
+import hashlib
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Files at least this large are memory-mapped rather than read into memory
+MMAP_THRESHOLD = 1 << 20
+
+
+def scan_file(path):
+    """
+    Return the set of link targets in the HTML file at `path`.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                return links_in(contents)
+        return links_in(f.read())
+
+
+def fingerprint_file(path):
+    """
+    Return the SHA-1 digest of the HTML file at `path` and the set of
+    link targets in it.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+                return hashlib.sha1(contents).hexdigest(), links_in(contents)
+        contents = f.read()
+        return hashlib.sha1(contents).hexdigest(), links_in(contents)
+
+
+def links_in(contents):
+    return {
+        match.group(1).decode("utf-8", "replace")
+        for match in LINK.finditer(contents)
+    }
+
+
+def scan_pages(directory, workers=1):
+    """
+    Yield (page, links) for every HTML page in `directory` as it is
+    scanned, where `links` is the set of other pages in the directory
+    that it links to.
+
+    With more than one worker, pages are scanned by a process pool.
+    """
+    pages = [filename for filename in os.listdir(directory) if filename.endswith(".html")]
+    corpus = set(pages)
+    paths = [os.path.join(directory, page) for page in pages]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            chunksize = max(1, len(paths) // (workers * 4))
+            found = executor.map(scan_file, paths, chunksize=chunksize)
+            for page, links in zip(pages, found):
+                yield page, (links & corpus) - {page}
+    else:
+        for page, path in zip(pages, paths):
+            yield page, (scan_file(path) & corpus) - {page}
+
+
+def scan_edges(directory, workers=1):
+    """
+    Yield a (page, linked page) pair for every link between pages in
+    `directory`, without building the corpus dictionary.
+    """
+    for page, links in scan_pages(directory, workers):
+        for link in links:
+            yield page, link
@@ -0,0 +1,97 @@
+import sys
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; memory is then left unreported
+    resource = None
+
+
+class ConvergenceReport():
+    """
+    Per-iteration record of how a PageRank computation converges, and
+    the policy for stopping it early.
+
+    Pass a report as the `report` of `sample_pagerank` or
+    `iterate_pagerank`, or as the `progress` callback of
+    `power_iteration` or `out_of_core_pagerank`. Each call records the
+    iteration number, the L1 residual, the seconds it took, the samples
+    drawn per second (for sampling) and the peak memory of the process
+    in bytes, then passes the record on to `callback`, if given.
+
+    The computation is told to stop early once the residual falls below
+    `tolerance`, once `time_budget` seconds have gone by in total, or
+    once the residual has not improved for `patience` iterations in a
+    row, as happens when sampling noise swamps it. Any of them may be
+    None to disable it.
+    """
+
+    def __init__(self, tolerance=None, time_budget=None, patience=None, callback=None):
+        self.tolerance = tolerance
+        self.time_budget = time_budget
+        self.patience = patience
+        self.callback = callback
+        self.iterations = []
+        self.stop_reason = None
+        self.best = None
+        self.stalled = 0
+
+    def __call__(self, iteration, residual, seconds, samples=None):
+        """
+        Record an iteration, and return True if the computation
+        should stop.
+        """
+        record = {
+            "iteration": iteration,
+            "residual": residual,
+            "seconds": seconds,
+            "samples_per_second": samples / seconds if samples and seconds > 0 else None,
+            "memory": peak_memory()
+        }
+        self.iterations.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+        if self.best is None or residual < self.best:
+            self.best = residual
+            self.stalled = 0
+        else:
+            self.stalled += 1
+
+        if self.tolerance is not None and residual < self.tolerance:
+            self.stop_reason = "tolerance"
+        elif self.time_budget is not None and self.total_seconds() >= self.time_budget:
+            self.stop_reason = "time budget"
+        elif self.patience is not None and self.stalled >= self.patience:
+            self.stop_reason = "stalled"
+        return self.stop_reason is not None
+
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.iterations)
+
+    def summary(self):
+        """
+        Return a dictionary with the number of iterations, the final
+        residual, the total seconds, the peak memory and why the
+        computation stopped early (None if it did not).
+        """
+        last = self.iterations[-1] if self.iterations else {}
+        return {
+            "iterations": len(self.iterations),
+            "residual": last.get("residual"),
+            "seconds": self.total_seconds(),
+            "memory": last.get("memory"),
+            "stop_reason": self.stop_reason
+        }
+
+
+def peak_memory():
+    """
+    Return the peak resident memory of this process in bytes, or None
+    where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    # Linux reports kilobytes, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
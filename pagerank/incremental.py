@@ -0,0 +1,189 @@
+from collections import deque
+
+import numpy as np
+
+from linkgraph import LinkGraph, power_iteration
+
+# Do a vectorized sweep over every page instead of pushing page by page
+# once more than this fraction of the pages have residual to push
+SWEEP_FRACTION = 0.1
+
+# Fewest pushes to try page by page before checking whether to sweep
+PUSH_BUDGET = 1000
+
+
+class IncrementalPageRank():
+    """
+    PageRank values kept up to date as links are added and removed.
+
+    Alongside the ranks `x` it keeps the residual
+    `r = (1 - d) / N + d * P x - x` of the PageRank equation. An edit to
+    the links of a page only changes the residual of the pages it linked
+    to before and after, and pushing residual from a page into its rank
+    and on to the pages it links to drives the residual back to zero
+    without touching the rest of the corpus.
+
+    The L1 error of the ranks is at most the L1 norm of the residual
+    divided by `1 - d`.
+    """
+
+    def __init__(self, corpus, damping_factor, tolerance=1e-6):
+        self.damping_factor = damping_factor
+        self.tolerance = tolerance
+        graph = LinkGraph.from_corpus(corpus)
+        self.pages = graph.pages
+        self.page_index = graph.page_index
+        n = len(self.pages)
+        self.links = [
+            graph.targets[graph.offsets[i]:graph.offsets[i + 1]].tolist()
+            for i in range(n)
+        ]
+        self.x, _ = power_iteration(graph, damping_factor, tolerance * (1 - damping_factor))
+        self.graph = graph
+        self.r = self.residual()
+        # Residual added to every page at once by pushes from dangling pages
+        self.uniform = 0.0
+        self.propagate()
+
+    def ranks(self):
+        """
+        Return the current PageRank values as a dictionary.
+        """
+        return {page: float(rank) for page, rank in zip(self.pages, self.x)}
+
+    def error_bound(self):
+        """
+        Return an upper bound on the L1 distance of the current ranks
+        from the exact PageRank values.
+        """
+        return float(np.abs(self.r + self.uniform).sum()) / (1 - self.damping_factor)
+
+    def update(self, added=(), removed=()):
+        """
+        Add the `added` links and remove the `removed` links, each an
+        iterable of (page, linked page) pairs, and update the ranks.
+
+        Return the error bound of the updated ranks. Raises KeyError
+        for pages not in the corpus.
+        """
+        changes = {}
+        for pairs, adding in ((removed, False), (added, True)):
+            for page, link in pairs:
+                source = self.page_index[page]
+                target = self.page_index[link]
+                if source == target:
+                    continue
+                new_links = changes.setdefault(source, set(self.links[source]))
+                if adding:
+                    new_links.add(target)
+                else:
+                    new_links.discard(target)
+
+        for source, new_links in changes.items():
+            old_links = self.links[source]
+            if set(old_links) == new_links:
+                continue
+            # Move this page's contribution from its old links to its new ones
+            share = self.damping_factor * self.x[source]
+            self.spread(old_links, -share)
+            self.links[source] = sorted(new_links)
+            self.spread(self.links[source], share)
+            self.graph = None
+        self.propagate()
+        return self.error_bound()
+
+    def spread(self, links, amount):
+        """
+        Add `amount` to the residual, shared among `links`, or among
+        every page if there are none.
+        """
+        if links:
+            self.r[links] += amount / len(links)
+        else:
+            self.uniform += amount / len(self.pages)
+
+    def propagate(self):
+        """
+        Push residual until the error bound is within the tolerance.
+
+        Residual concentrated on a few pages, as after a small edit, is
+        pushed page by page; once it has spread over many pages, every
+        page is pushed at once with vectorized sweeps.
+        """
+        n = len(self.pages)
+        target = self.tolerance * (1 - self.damping_factor)
+        while True:
+            self.r += self.uniform
+            self.uniform = 0.0
+            if np.abs(self.r).sum() <= target:
+                return
+            active = np.flatnonzero(np.abs(self.r) > target / n)
+            if len(active) > SWEEP_FRACTION * n:
+                self.sweep()
+            else:
+                self.push(active, target / n, max(PUSH_BUDGET, int(SWEEP_FRACTION * n)))
+
+    def push(self, active, threshold, budget):
+        """
+        Push residual above `threshold` page by page, starting from the
+        pages in `active`, for at most `budget` pushes.
+        """
+        d = self.damping_factor
+        n = len(self.pages)
+        x, r, links = self.x, self.r, self.links
+        queue = deque(active.tolist())
+        queued = set(queue)
+        while queue and budget > 0:
+            page = queue.popleft()
+            queued.discard(page)
+            amount = r[page] + self.uniform
+            if abs(amount) <= threshold:
+                continue
+            budget -= 1
+            x[page] += amount
+            r[page] -= amount
+            targets = links[page]
+            if not targets:
+                # Spreading over every page is left to the next round
+                self.uniform += d * amount / n
+                continue
+            share = d * amount / len(targets)
+            for target in targets:
+                r[target] += share
+                if target not in queued and abs(r[target] + self.uniform) > threshold:
+                    queue.append(target)
+                    queued.add(target)
+
+    def sweep(self):
+        """
+        Push the residual of every page at once, with sparse arrays.
+        """
+        if self.graph is None:
+            self.graph = self.link_graph()
+        graph = self.graph
+        n = len(self.pages)
+        amount = self.r
+        self.x += amount
+        following = graph.follow(amount)
+        dangling = amount[graph.dangling].sum()
+        self.r = self.damping_factor * (following + dangling / n)
+
+    def residual(self):
+        """
+        Compute the residual of the PageRank equation for the ranks `x`.
+        """
+        graph = self.graph
+        n = len(self.pages)
+        following = graph.follow(self.x)
+        dangling = self.x[graph.dangling].sum()
+        d = self.damping_factor
+        return (1 - d) / n + d * (following + dangling / n) - self.x
+
+    def link_graph(self):
+        """
+        Rebuild the sparse link arrays from the current links.
+        """
+        offsets = np.zeros(len(self.pages) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(targets) for targets in self.links])
+        targets = np.array([t for targets in self.links for t in targets], dtype=np.int64)
+        return LinkGraph(self.pages, offsets, targets)
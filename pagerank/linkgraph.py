@@ -0,0 +1,199 @@
+import random
+import time
+
+import numpy as np
+
+
+class LinkGraph():
+    """
+    Corpus pages numbered 0 to n - 1, with the links out of page `i`
+    stored as `targets[offsets[i]:offsets[i + 1]]`.
+    """
+
+    def __init__(self, pages, offsets, targets):
+        self.pages = pages
+        self.offsets = offsets
+        self.targets = targets
+        self.page_index = {page: i for i, page in enumerate(pages)}
+        self.out_degree = np.diff(offsets)
+        self.dangling = self.out_degree == 0
+        # Share of a page's rank passed along each of its links
+        self.link_share = np.divide(
+            1.0, self.out_degree, out=np.zeros(len(pages)), where=~self.dangling
+        )
+        # Source page of every link, parallel to `targets`
+        self.sources = np.repeat(np.arange(len(pages)), self.out_degree)
+        # Sparse transition matrix for many distributions at once,
+        # built when first needed
+        self.matrix = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the graph from a corpus dictionary as returned by `crawl`.
+        """
+        pages = sorted(corpus)
+        page_index = {page: i for i, page in enumerate(pages)}
+        offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+        targets = []
+        for i, page in enumerate(pages):
+            links = sorted(page_index[link] for link in corpus[page])
+            targets.extend(links)
+            offsets[i + 1] = offsets[i] + len(links)
+        return cls(pages, offsets, np.array(targets, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def follow(self, values):
+        """
+        Return the mass that reaches each page when every page passes
+        `values` on evenly along its links. `values` is an array indexed
+        like the pages, or a matrix with one column per distribution.
+        Pages without links pass nothing on.
+        """
+        n = len(self.pages)
+        if values.ndim == 1:
+            return np.bincount(self.targets, weights=(values * self.link_share)[self.sources], minlength=n)
+        if self.matrix is None:
+            # Only many distributions at once need SciPy
+            import scipy.sparse
+            self.matrix = scipy.sparse.csr_matrix(
+                (self.link_share[self.sources], (self.targets, self.sources)), shape=(n, n)
+            )
+        return self.matrix @ values
+
+    def to_array(self, values, default):
+        """
+        Return `values`, a dictionary from page names to values, as an
+        array indexed like the pages, using `default` for missing pages.
+        """
+        return np.array([values.get(page, default) for page in self.pages], dtype=np.float64)
+
+    def to_dict(self, ranks):
+        """
+        Return `ranks`, an array indexed like the pages, as a dictionary
+        from page names to values.
+        """
+        return {page: float(rank) for page, rank in zip(self.pages, ranks)}
+
+
+def random_walk(graph, damping_factor, n, rng=random, start=None):
+    """
+    Walk `n` pages of the random surfer on `graph`, starting at page
+    index `start` (chosen uniformly by default), and return how often
+    each page was visited.
+
+    Each step costs O(1): with probability `damping_factor` the surfer
+    follows a uniformly chosen link out of its page; otherwise, or if
+    the page has no links, it jumps to a uniformly chosen page.
+    """
+    for _, counts in walk_checkpoints(graph, damping_factor, n, n, rng, start):
+        pass
+    return counts
+
+
+def walk_checkpoints(graph, damping_factor, n, every, rng=random, start=None):
+    """
+    Walk `n` pages of the random surfer like `random_walk`, yielding the
+    number of pages walked so far and the visit counts every `every`
+    pages and at the end of the walk.
+    """
+    # Memoryviews index as fast as plain lists one element at a time,
+    # unlike NumPy arrays, and read the link arrays in place rather than
+    # copying them, so walks over shared memory stay shared
+    offsets = memoryview(np.ascontiguousarray(graph.offsets))
+    targets = memoryview(np.ascontiguousarray(graph.targets))
+    pages = len(graph)
+    counts = [0] * pages
+    random_number = rng.random
+    page = rng.randrange(pages) if start is None else start
+    counts[page] += 1
+    walked = 1
+    while True:
+        stop = min(n, walked + every)
+        for _ in range(stop - walked):
+            start = offsets[page]
+            links = offsets[page + 1] - start
+            if links and random_number() < damping_factor:
+                page = targets[start + int(random_number() * links)]
+            else:
+                page = int(random_number() * pages)
+            counts[page] += 1
+        walked = stop
+        yield walked, np.array(counts, dtype=np.int64)
+        if walked >= n:
+            return
+
+
+def batch_random_walk(graph, damping_factor, n, surfers, rng, burn_in=0):
+    """
+    Advance `surfers` independent random surfers on `graph` in lock step,
+    drawing from NumPy generator `rng`, until `n` visits have been counted.
+    Return how often each page was visited.
+
+    Surfers start at uniformly chosen pages, and their first `burn_in`
+    steps are not counted, so the short walks forget their start.
+    """
+    pages = len(graph)
+    link_starts = graph.offsets[:-1]
+    counts = np.zeros(pages, dtype=np.int64)
+    positions = rng.integers(pages, size=surfers)
+    remaining = n
+    steps = 0
+    while remaining > 0:
+        if steps >= burn_in:
+            counted = positions[:remaining]
+            counts += np.bincount(counted, minlength=pages)
+            remaining -= len(counted)
+        steps += 1
+
+        out_degree = graph.out_degree[positions]
+        follow = (rng.random(surfers) < damping_factor) & (out_degree > 0)
+        choice = (rng.random(surfers) * out_degree).astype(np.int64)
+        followers = positions[follow]
+        positions = rng.integers(pages, size=surfers)
+        positions[follow] = graph.targets[link_starts[followers] + choice[follow]]
+    return counts
+
+
+def step(graph, ranks, damping_factor):
+    """
+    Return the ranks after one step of the random surfer from `ranks`.
+
+    With probability `damping_factor` the surfer follows a link from its
+    page, chosen uniformly; otherwise, or if the page has no links, it
+    jumps to any page in the corpus.
+    """
+    n = len(graph)
+    following = graph.follow(ranks)
+    dangling_mass = ranks[graph.dangling].sum()
+    return damping_factor * (following + dangling_mass / n) + (1 - damping_factor) * ranks.sum() / n
+
+
+def power_iteration(graph, damping_factor, tolerance, max_iterations=1000, start=None, progress=None):
+    """
+    Iterate the PageRank equation on `graph` from `start` (uniform by
+    default) until the L1 change between iterations is below `tolerance`.
+
+    After each iteration `progress`, if given, is called with the
+    iteration number, the L1 change and the seconds the iteration took,
+    and iteration stops early if it returns True.
+
+    Return the rank array and the number of iterations taken.
+    """
+    n = len(graph)
+    if start is None:
+        ranks = np.full(n, 1 / n)
+    else:
+        ranks = np.asarray(start, dtype=np.float64) / np.sum(start)
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        new_ranks = step(graph, ranks, damping_factor)
+        residual = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if progress is not None and progress(iteration, float(residual), time.perf_counter() - began):
+            break
+        if residual < tolerance:
+            break
+    return ranks, iteration
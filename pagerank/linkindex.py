@@ -0,0 +1,109 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from crawler import fingerprint_file
+
+# Bump whenever the layout of the index file changes
+VERSION = 1
+
+# Files kept in the corpus directory between runs
+INDEX_FILE = ".pagerank-links.json"
+RANKS_FILE = ".pagerank-ranks.json"
+
+
+class LinkIndex():
+    """
+    The links of every page in a corpus directory, saved between runs
+    with each file's size, modification time and content hash, so only
+    pages that changed need to be parsed again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        # Maps page names to a list of: size, mtime_ns, sha1, links
+        self.pages = {}
+        data = read_json(os.path.join(directory, INDEX_FILE))
+        if data is not None and data.get("version") == VERSION:
+            self.pages = data["pages"]
+
+    def refresh(self, workers=1):
+        """
+        Bring the index up to date with the directory, parsing only pages
+        that were added or whose size or modification time changed.
+
+        Return the set of pages added, removed or with new contents.
+        """
+        stats = {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".html"):
+                stat = entry.stat()
+                stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+
+        changed = set(self.pages) - set(stats)
+        for page in changed:
+            del self.pages[page]
+
+        stale = [
+            page for page, stat in stats.items()
+            if page not in self.pages or tuple(self.pages[page][:2]) != stat
+        ]
+        paths = [os.path.join(self.directory, page) for page in stale]
+        if workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                chunksize = max(1, len(paths) // (workers * 4))
+                fingerprints = list(executor.map(fingerprint_file, paths, chunksize=chunksize))
+        else:
+            fingerprints = [fingerprint_file(path) for path in paths]
+
+        for page, (digest, links) in zip(stale, fingerprints):
+            # A file touched without being edited keeps its hash
+            if page not in self.pages or self.pages[page][2] != digest:
+                changed.add(page)
+            self.pages[page] = [*stats[page], digest, sorted(links)]
+        return changed
+
+    def corpus(self):
+        """
+        Return the corpus dictionary, like `crawl`.
+        """
+        return {
+            page: {link for link in links if link in self.pages and link != page}
+            for page, (_, _, _, links) in self.pages.items()
+        }
+
+    def save(self):
+        write_json(os.path.join(self.directory, INDEX_FILE), {
+            "version": VERSION,
+            "pages": self.pages
+        })
+
+
+def load_ranks(directory):
+    """
+    Return the ranks last saved for `directory` by `save_ranks`,
+    or None if there are none.
+    """
+    return read_json(os.path.join(directory, RANKS_FILE))
+
+
+def save_ranks(directory, ranks):
+    write_json(os.path.join(directory, RANKS_FILE), ranks)
+
+
+def read_json(filename):
+    try:
+        with open(filename, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(filename, data):
+    """
+    Write `data` to `filename` as JSON, replacing the file atomically.
+    """
+    temporary = f"{filename}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temporary, filename)
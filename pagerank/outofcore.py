@@ -0,0 +1,167 @@
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from crawler import scan_pages
+from ranking import RankTable
+
+# File header: magic, number of pages and number of links, followed by
+# the out-degree of every page and then (source, target) pairs, as int64
+HEADER = struct.Struct("<8sqq")
+MAGIC = b"PREDGES1"
+
+# Links read from disk at a time on each iteration
+BLOCK_EDGES = 1 << 22
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PageRank over link files larger than memory.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="crawl a corpus into a binary edge list")
+    build.add_argument("corpus")
+    build.add_argument("edges")
+    build.add_argument("--workers", type=int, default=1)
+
+    rank = subparsers.add_parser("rank", help="compute PageRank from an edge list")
+    rank.add_argument("edges")
+    rank.add_argument("--damping", type=float, default=0.85)
+    rank.add_argument("--tolerance", type=float, default=1e-8)
+    rank.add_argument("--block", type=int, default=BLOCK_EDGES,
+                      help="links read from disk at a time")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        pages, edges = write_edge_list(args.corpus, args.edges, args.workers)
+        print(f"Wrote {edges} links between {pages} pages to {args.edges}")
+    else:
+        output = f"{args.edges}.ranks"
+        pages = read_pages(args.edges)
+        # Iterate in a scratch file, then write the result in the same
+        # format as every other exported rank file
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as workdir:
+            ranks = out_of_core_pagerank(
+                args.edges, args.damping, args.tolerance, os.path.join(workdir, "ranks"),
+                args.block, print_progress
+            )
+            RankTable(pages, ranks).save(output)
+            del ranks
+        print(f"Wrote PageRank values for {len(pages)} pages to {output}")
+
+
+def write_edge_list(directory, filename, workers=1):
+    """
+    Crawl the corpus in `directory` into a binary edge list `filename`,
+    with the page names one per line in `filename`.pages, streaming links
+    to disk as pages are scanned.
+
+    Return the number of pages and links written.
+    """
+    pages = sorted(page for page in os.listdir(directory) if page.endswith(".html"))
+    page_index = {page: i for i, page in enumerate(pages)}
+    with open(f"{filename}.pages", "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+    degrees = np.zeros(len(pages), dtype=np.int64)
+    edges = 0
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(pages), 0))
+        f.write(degrees.tobytes())
+        for page, links in scan_pages(directory, workers):
+            source = page_index[page]
+            targets = sorted(page_index[link] for link in links)
+            pairs = np.empty((len(targets), 2), dtype=np.int64)
+            pairs[:, 0] = source
+            pairs[:, 1] = targets
+            f.write(pairs.tobytes())
+            degrees[source] = len(targets)
+            edges += len(targets)
+
+        # Fill in what was only known once every page was scanned
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(pages), edges))
+        f.write(degrees.tobytes())
+    return len(pages), edges
+
+
+def open_edge_list(filename):
+    """
+    Memory-map the edge list `filename`.
+    Return the out-degree array and the (source, target) array of links.
+    """
+    with open(filename, "rb") as f:
+        magic, n, edges = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a PageRank edge list")
+    degrees = np.memmap(filename, dtype=np.int64, mode="r", offset=HEADER.size, shape=(n,))
+    links = np.memmap(
+        filename, dtype=np.int64, mode="r", offset=HEADER.size + 8 * n, shape=(edges, 2)
+    ) if edges else np.zeros((0, 2), dtype=np.int64)
+    return degrees, links
+
+
+def read_pages(filename):
+    """
+    Return the page names of edge list `filename`, in page order.
+    """
+    with open(f"{filename}.pages", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def out_of_core_pagerank(filename, damping_factor, tolerance, output,
+                         block_edges=BLOCK_EDGES, progress=None, max_iterations=1000):
+    """
+    Compute PageRank over edge list `filename`, streaming the links from
+    disk in blocks of `block_edges` on every iteration until the L1 change
+    is below `tolerance`. The rank vectors are memory-mapped float arrays,
+    and the result is left in `output`.
+
+    After each iteration `progress`, if given, is called with the iteration
+    number, the L1 change and the seconds the iteration took, and
+    iteration stops early if it returns True.
+
+    Return the ranks, memory-mapped from `output`.
+    """
+    degrees, links = open_edge_list(filename)
+    n = len(degrees)
+    dangling = np.flatnonzero(degrees == 0)
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as workdir:
+        ranks = np.memmap(output, dtype=np.float64, mode="w+", shape=(n,))
+        new_ranks = np.memmap(os.path.join(workdir, "ranks"), dtype=np.float64, mode="w+", shape=(n,))
+        ranks[:] = 1 / n
+        for iteration in range(1, max_iterations + 1):
+            start = time.perf_counter()
+            new_ranks[:] = 0
+            for first in range(0, len(links), block_edges):
+                block = np.asarray(links[first:first + block_edges])
+                sources = block[:, 0]
+                new_ranks += np.bincount(
+                    block[:, 1], weights=ranks[sources] / degrees[sources], minlength=n
+                )
+            dangling_mass = ranks[dangling].sum()
+            new_ranks *= damping_factor
+            new_ranks += damping_factor * dangling_mass / n + (1 - damping_factor) / n
+            residual = float(np.abs(new_ranks - ranks).sum())
+            ranks[:] = new_ranks
+            if progress is not None and progress(iteration, residual, time.perf_counter() - start):
+                break
+            if residual < tolerance:
+                break
+        ranks.flush()
+        del new_ranks
+    return np.memmap(output, dtype=np.float64, mode="r", shape=(n,))
+
+
+def print_progress(iteration, residual, seconds):
+    print(f"Iteration {iteration}: L1 change {residual:.3e} in {seconds:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
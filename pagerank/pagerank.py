@@ -1,51 +1,86 @@
-import os
+import argparse
 import random
-import re
-import sys
+import time
+
+import numpy as np
+
+from crawler import scan_pages
+from linkgraph import LinkGraph, batch_random_walk, power_iteration, random_walk, walk_checkpoints
+from linkindex import LinkIndex, load_ranks, save_ranks
+from ranking import RankTable
+from sharded import sharded_random_walk
 
 DAMPING = 0.85
 SAMPLES = 10000
+TOLERANCE = 1e-8
+
+# Random surfers moving together in batch sampling, and the steps each
+# takes before its visits count
+SURFERS = 1000
+BURN_IN = 50
+
+# Times a reported sampling run stops to measure its convergence
+CHECKPOINTS = 20
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Rank the pages of a corpus.")
+    parser.add_argument("corpus")
+    parser.add_argument("--top", type=int, metavar="K",
+                        help="print only the K best pages of each ranking")
+    parser.add_argument("--export", metavar="FILE",
+                        help="write the iterated ranks to FILE as binary instead of printing them")
+    args = parser.parse_args()
+
+    corpus = crawl(args.corpus, use_index=True)
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
-    for page in sorted(ranks):
-        print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    print_ranks(ranks, args.top)
+    ranks = iterate_pagerank(corpus, DAMPING, start=load_ranks(args.corpus))
+    try:
+        save_ranks(args.corpus, ranks)
+    except OSError:
+        pass
+    if args.export:
+        RankTable.from_dict(ranks).save(args.export)
+        print(f"Wrote PageRank values for {len(ranks)} pages to {args.export}")
+        return
     print(f"PageRank Results from Iteration")
-    for page in sorted(ranks):
-        print(f"  {page}: {ranks[page]:.4f}")
+    print_ranks(ranks, args.top)
 
 
-def crawl(directory):
+def print_ranks(ranks, top=None):
     """
-    Parse a directory of HTML pages and check for links to other pages.
-    Return a dictionary where each key is a page, and values are
-    a list of all other pages in the corpus that are linked to by the page.
+    Print `ranks` by page name, or only the `top` best pages, best first.
     """
-    pages = dict()
+    if top is None:
+        entries = sorted(ranks.items())
+    else:
+        entries = RankTable.from_dict(ranks).top(top)
+    for page, rank in entries:
+        print(f"  {page}: {rank:.4f}")
 
-    # Extract all links from HTML files
-    for filename in os.listdir(directory):
-        if not filename.endswith(".html"):
-            continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
 
-    # Only include links to other pages in the corpus
-    for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
+def crawl(directory, workers=1, use_index=False):
+    """
+    Parse a directory of HTML pages and check for links to other pages.
+    Return a dictionary where each key is a page, and values are
+    a list of all other pages in the corpus that are linked to by the page.
 
-    return pages
+    With more than one worker, pages are parsed in parallel processes.
+    With `use_index`, links are kept in an index file in the directory
+    between runs, and only pages that changed since are parsed again.
+    """
+    if not use_index:
+        return dict(scan_pages(directory, workers))
+    index = LinkIndex(directory)
+    index.refresh(workers)
+    try:
+        index.save()
+    except OSError:
+        # A read-only corpus just means a full crawl next time
+        pass
+    return index.corpus()
 
 
 def transition_model(corpus, page, damping_factor):
@@ -76,7 +111,7 @@ def transition_model(corpus, page, damping_factor):
         print(f"something wrong with transition_model: {round(sum(probability_distribution.values()),4)}")
     return probability_distribution
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, report=None, workers=1, seed=None):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
@@ -84,42 +119,59 @@ def sample_pagerank(corpus, damping_factor, n):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """
-    
-    sample_dictionary = {}
-
-    # Pick random page
-    page = random.choice(list(corpus.keys()))
-
-    # Do the first calculation outside of loop, loop could be refactored to make this redundant
-    transition_probabilities = transition_model(corpus, page, damping_factor)
-    sample_dictionary[page] = 1
-
-    for i in range(n-1):
-        random_number_to_decide_new_page = random.random()
-        probability_calculation = 0
-        for sub_page, probability in transition_probabilities.items():
-            probability_calculation += probability
-            # Check if random picked the given sub_page
-            if probability_calculation > random_number_to_decide_new_page:
-                
-                # Increment dict value for sub_page, these values are occurences, will be calculated into probability
-                sample_dictionary[sub_page] = sample_dictionary.get(sub_page, 0) + 1
-                transition_probabilities = transition_model(corpus, sub_page, damping_factor)
-                break
-
-    # Turn the dictionary values into probabilities(0-1)
-    for page, probability in sample_dictionary.items():
-        sample_dictionary[page] /= n
-    
-    if round(sum(sample_dictionary.values()),4) != 1:
-        print(f"something wrong with sample_pagerank: {round(sum(sample_dictionary.values()),4)}")
 
-    return sample_dictionary
+    With a `report`, such as a `diagnostics.ConvergenceReport`, the walk
+    is measured at `CHECKPOINTS` points, taking the L1 change in the
+    estimate since the last one as the residual, and stops early if the
+    report says so.
 
+    With more than one worker, the samples are split into one walk per
+    worker process, each seeded from `seed`, so the result is the same
+    for a fixed seed and number of workers. Reports are not supported
+    with more than one worker.
+    """
+    # Sample from the link arrays directly rather than calling
+    # transition_model, which rebuilds a distribution over every page
+    graph = LinkGraph.from_corpus(corpus)
+    if workers > 1:
+        if report is not None:
+            raise ValueError("sampling with more than one worker cannot be reported")
+        counts = sharded_random_walk(graph, damping_factor, n, workers, seed)
+        return graph.to_dict(counts / n)
+    rng = random if seed is None else random.Random(seed)
+    if report is None:
+        counts = random_walk(graph, damping_factor, n, rng)
+        return graph.to_dict(counts / n)
+
+    every = max(1, n // CHECKPOINTS)
+    estimate = np.full(len(graph), 1 / len(graph))
+    previous = 0
+    began = time.perf_counter()
+    for checkpoint, (walked, counts) in enumerate(walk_checkpoints(graph, damping_factor, n, every, rng), 1):
+        new_estimate = counts / walked
+        residual = float(np.abs(new_estimate - estimate).sum())
+        estimate = new_estimate
+        now = time.perf_counter()
+        if report(checkpoint, residual, now - began, walked - previous):
+            break
+        previous = walked
+        began = now
+    return graph.to_dict(estimate)
+
+
+def batch_sample_pagerank(corpus, damping_factor, n, surfers=SURFERS, seed=None):
+    """
+    Return PageRank values for each page estimated from `n` samples,
+    like `sample_pagerank`, but drawn by `surfers` random surfers moving
+    together, with NumPy random generator seeded by `seed`.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    rng = np.random.default_rng(seed)
+    counts = batch_random_walk(graph, damping_factor, n, surfers, rng, BURN_IN)
+    return graph.to_dict(counts / n)
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE, start=None, report=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -127,63 +179,20 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """
 
-    # Return dictionary with pages: page name as key, occurence as value, value will be calculated into % before returning
-    iterative_dictionary = {}
-    number_of_pages_counted = len(corpus)
+    Iteration starts from `start`, a dictionary of earlier PageRank
+    values, if given; pages missing from it start at 1 / N.
 
-    # Setup starting values, value is occurence of given page
-    for page in corpus.keys():
-        iterative_dictionary[page] = 1
-    
-    # Pick random page
-    page = random.choice(list(corpus.keys()))
-
-    # Setup starting state with random first choice
-    iterative_dictionary[page] = iterative_dictionary.get(page, 0) + 1
-    transition_probabilities = transition_model(corpus, page, damping_factor)
-    number_of_pages_counted += 1
-
-    # We will repeat until any difference in chances is bigger than 0.001
-    repeat = True
-    while repeat:
-        repeat = False
-
-        # Random number to determine which option we pick
-        random_number_to_decide_new_page = random.random()
-        probability_calculation = 0
-
-        # Iterate over the sub pages to find the random one we looking for, get the transition probabilities, increment dictionary values
-        for sub_page, probability in transition_probabilities.items():
-            probability_calculation += probability
-            # Check if random picked the given sub_page
-            if probability_calculation > random_number_to_decide_new_page:
-                
-                # Increment dict value for sub_page, these values are occurences, will be calculated into probability  
-                iterative_dictionary[sub_page] = iterative_dictionary.get(sub_page, 0) + 1
-                number_of_pages_counted += 1
-                transition_probabilities = transition_model(corpus, sub_page, damping_factor)
-                
-                # Check if any value changes by more than 0.001, if yes, repeat and break out of loop
-                for page, occurence in iterative_dictionary.items():
-                    if page == sub_page:
-                        if (occurence / number_of_pages_counted) - ((occurence - 1) / (number_of_pages_counted - 1)) >= 0.001:
-                            repeat = True
-                            break
-                    elif ((occurence / (number_of_pages_counted - 1)) - (occurence / number_of_pages_counted)) >= 0.001:
-                        repeat = True
-                        break
-                break
-
-    # Turn the dictionary values into probabilities(0-1)
-    for page, probability in iterative_dictionary.items():
-        iterative_dictionary[page] /= number_of_pages_counted
-    
-    if round(sum(iterative_dictionary.values()),4) != 1:
-        print(f"something wrong with iterate_pagerank: {round(sum(iterative_dictionary.values()),4)}")
-
-    return iterative_dictionary
+    A `report`, such as a `diagnostics.ConvergenceReport`, is called
+    after every iteration and may stop iteration early.
+    """
+    # Power iteration on the sparse link matrix, until the ranks change
+    # by less than `tolerance` in total from one iteration to the next
+    graph = LinkGraph.from_corpus(corpus)
+    if start is not None:
+        start = graph.to_array(start, 1 / len(graph))
+    ranks, _ = power_iteration(graph, damping_factor, tolerance, start=start, progress=report)
+    return graph.to_dict(ranks)
 
 if __name__ == "__main__":
     main()
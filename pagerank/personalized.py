@@ -0,0 +1,88 @@
+import numpy as np
+
+from linkgraph import LinkGraph
+
+
+def teleport_matrix(graph, seed_sets):
+    """
+    Return a matrix with one column per set of pages in `seed_sets`,
+    teleporting uniformly to the pages in that set.
+    """
+    teleport = np.zeros((len(graph), len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        rows = [graph.page_index[page] for page in seeds]
+        teleport[rows, column] = 1 / len(rows)
+    return teleport
+
+
+def personalized_pagerank(graph, damping_factor, teleport, tolerance, max_iterations=1000):
+    """
+    Return personalized PageRank values for every column of `teleport`,
+    a matrix of teleport distributions over the pages of `graph`.
+
+    All columns are iterated together, one sparse matrix-matrix product
+    per iteration, until no column changes by more than `tolerance` in L1.
+    The surfer teleports according to its column, and so does a surfer
+    on a page without links.
+    """
+    teleport = np.asarray(teleport, dtype=np.float64)
+    if teleport.ndim == 1:
+        teleport = teleport[:, None]
+    teleport = teleport / teleport.sum(axis=0)
+    ranks = teleport.copy()
+    for _ in range(max_iterations):
+        dangling_mass = ranks[graph.dangling].sum(axis=0)
+        new_ranks = damping_factor * (graph.follow(ranks) + teleport * dangling_mass) \
+            + (1 - damping_factor) * teleport
+        residual = np.abs(new_ranks - ranks).sum(axis=0).max()
+        ranks = new_ranks
+        if residual < tolerance:
+            break
+    return ranks
+
+
+def personalized_ranks(corpus, damping_factor, seed_sets, tolerance):
+    """
+    Return a PageRank dictionary, like `iterate_pagerank`, personalized
+    to each set of pages in `seed_sets`.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks = personalized_pagerank(graph, damping_factor, teleport_matrix(graph, seed_sets), tolerance)
+    return [graph.to_dict(ranks[:, column]) for column in range(len(seed_sets))]
+
+
+def local_push(graph, damping_factor, seed, epsilon):
+    """
+    Approximate the PageRank values personalized to page index `seed`
+    by pushing probability out from it, touching only pages near it.
+
+    Pushes stop once every page holds less than `epsilon` of unpushed
+    probability per link. Return a dictionary of the nonzero estimates
+    by page index, and the total unpushed probability, which bounds
+    their L1 error.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    estimates = {}
+    residual = {seed: 1.0}
+    queue = [seed]
+    while queue:
+        page = queue.pop()
+        amount = residual.get(page, 0.0)
+        out_degree = int(offsets[page + 1] - offsets[page])
+        if amount < epsilon * max(out_degree, 1):
+            continue
+        residual[page] = 0.0
+        estimates[page] = estimates.get(page, 0.0) + (1 - damping_factor) * amount
+        if out_degree:
+            share = damping_factor * amount / out_degree
+            links = targets[offsets[page]:offsets[page + 1]].tolist()
+        else:
+            # A surfer stuck on a page without links teleports to the seed
+            share = damping_factor * amount
+            links = [seed]
+        for link in links:
+            residual[link] = residual.get(link, 0.0) + share
+            link_degree = max(int(offsets[link + 1] - offsets[link]), 1)
+            if residual[link] >= epsilon * link_degree:
+                queue.append(link)
+    return estimates, sum(residual.values())
@@ -0,0 +1,103 @@
+import os
+import struct
+
+import numpy as np
+
+# File header: magic, number of pages and bytes of page names, followed
+# by the ranks as float64 and then the page names, one per line
+HEADER = struct.Struct("<8sqq")
+MAGIC = b"PRRANKS1"
+
+
+class RankTable():
+    """
+    PageRank values held as an array indexed like `pages`, with a page
+    index for constant-time lookups and partial sorting for the best
+    pages, so queries never sort the whole corpus.
+    """
+
+    def __init__(self, pages, ranks):
+        self.pages = list(pages)
+        self.ranks = np.asarray(ranks, dtype=np.float64)
+        self.page_index = {page: i for i, page in enumerate(self.pages)}
+        # Position of every page, best first, built on first use
+        self.positions = None
+
+    @classmethod
+    def from_dict(cls, ranks):
+        """
+        Build the table from a dictionary of PageRank values, as returned
+        by `sample_pagerank` or `iterate_pagerank`.
+        """
+        pages = sorted(ranks)
+        return cls(pages, [ranks[page] for page in pages])
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, page):
+        """
+        Return the PageRank value of `page`. Raises KeyError for pages
+        not in the table.
+        """
+        return float(self.ranks[self.page_index[page]])
+
+    def position(self, page):
+        """
+        Return where `page` places when pages are ordered best first,
+        counting from 1; pages with equal values share a position.
+
+        The first call sorts the values once; later calls are O(1).
+        """
+        if self.positions is None:
+            # One more than the number of pages with strictly higher values
+            self.positions = np.searchsorted(np.sort(-self.ranks), -self.ranks, side="left") + 1
+        return int(self.positions[self.page_index[page]])
+
+    def top(self, k):
+        """
+        Return the `k` pages with the highest PageRank values as
+        (page, value) pairs, best first, ties broken by page order.
+        """
+        k = min(k, len(self.pages))
+        if k <= 0:
+            return []
+        if k < len(self.pages):
+            # Partitioning finds the k-th best value, but picks arbitrarily
+            # among pages tied with it, so take those in page order
+            threshold = self.ranks[np.argpartition(-self.ranks, k - 1)[k - 1]]
+            above = np.flatnonzero(self.ranks > threshold)
+            tied = np.flatnonzero(self.ranks == threshold)[:k - len(above)]
+            best = np.concatenate([above, tied])
+        else:
+            best = np.arange(len(self.pages))
+        best = best[np.lexsort((best, -self.ranks[best]))]
+        return [(self.pages[i], float(self.ranks[i])) for i in best]
+
+    def save(self, filename):
+        """
+        Write the table to `filename` as a compact binary file, replacing
+        it atomically.
+        """
+        names = "\n".join(self.pages).encode("utf-8")
+        temporary = f"{filename}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.pages), len(names)))
+            f.write(self.ranks.astype("<f8").tobytes())
+            f.write(names)
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Read a table written by `save`, with the ranks memory-mapped.
+        """
+        with open(filename, "rb") as f:
+            magic, n, size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{filename} is not a PageRank rank file")
+            f.seek(HEADER.size + 8 * n)
+            names = f.read(size).decode("utf-8")
+        ranks = np.memmap(filename, dtype="<f8", mode="r", offset=HEADER.size, shape=(n,)) \
+            if n else np.zeros(0)
+        return cls(names.split("\n") if n else [], ranks)
@@ -0,0 +1,75 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from linkgraph import random_walk
+
+# Link arrays of the graph being sampled, attached in each worker process
+shared = None
+
+
+class SharedLinks():
+    """
+    The offsets and targets of a `LinkGraph`, viewed from a block of
+    shared memory so every worker walks the same copy.
+    """
+
+    def __init__(self, memory, pages, links):
+        self.memory = memory
+        buffer = np.ndarray((pages + 1 + links,), dtype=np.int64, buffer=memory.buf)
+        self.offsets = buffer[:pages + 1]
+        self.targets = buffer[pages + 1:]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+def sharded_random_walk(graph, damping_factor, n, workers, seed=None):
+    """
+    Walk `n` pages of the random surfer on `graph` split into one walk
+    per worker process, and return how often each page was visited.
+
+    Worker `i` draws from its own stream of the `numpy.random.SeedSequence`
+    seeded by `seed`, so the counts are reproducible for a fixed seed and
+    number of workers. The link arrays are put in shared memory once and
+    walked in place, so a worker only holds its own visit counts.
+    """
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    seeds = [int(stream.generate_state(1)[0]) for stream in streams]
+    shards = [n // workers + (i < n % workers) for i in range(workers)]
+
+    pages = len(graph)
+    links = len(graph.targets)
+    memory = shared_memory.SharedMemory(create=True, size=8 * (pages + 1 + links))
+    try:
+        tables = SharedLinks(memory, pages, links)
+        tables.offsets[:] = graph.offsets
+        tables.targets[:] = graph.targets
+        with ProcessPoolExecutor(
+            workers, initializer=attach, initargs=(memory.name, pages, links)
+        ) as executor:
+            counts = executor.map(walk_shard, [damping_factor] * workers, shards, seeds)
+            total = np.zeros(pages, dtype=np.int64)
+            for shard_counts in counts:
+                total += shard_counts
+        del tables
+    finally:
+        memory.close()
+        memory.unlink()
+    return total
+
+
+def attach(name, pages, links):
+    """
+    Attach a worker process to the shared link arrays.
+    """
+    global shared
+    shared = SharedLinks(shared_memory.SharedMemory(name=name), pages, links)
+
+
+def walk_shard(damping_factor, n, seed):
+    if n == 0:
+        return np.zeros(len(shared), dtype=np.int64)
+    return random_walk(shared, damping_factor, n, random.Random(seed))
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import bench
+import pagerank
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_generate_corpus(tmp_path):
+    corpus = bench.generate_corpus(tmp_path, 300, dangling=0.1, farms=2, farm_size=10, seed=1)
+    assert pagerank.crawl(tmp_path) == corpus
+    assert len(corpus) == 300
+    assert any(not links for links in corpus.values())
+    assert all(page not in links for page, links in corpus.items())
+
+    # Farm pages link to each other and to one page outside the farm
+    farm = [f"page{page}.html" for page in range(280, 290)]
+    for page in farm:
+        outside = corpus[page] - set(farm)
+        assert corpus[page] - outside == set(farm) - {page}
+        assert len(outside) == 1
+
+
+def test_generate_corpus_is_seeded(tmp_path):
+    first = bench.generate_corpus(tmp_path / "a", 100, seed=2)
+    assert bench.generate_corpus(tmp_path / "b", 100, seed=2) == first
+
+
+def test_exact_pagerank_matches_iteration():
+    corpus = pagerank.crawl(os.path.join(HERE, "corpus2"))
+    exact = bench.exact_pagerank(corpus, pagerank.DAMPING)
+    iterated = pagerank.iterate_pagerank(corpus, pagerank.DAMPING)
+    assert exact == pytest.approx(iterated, abs=1e-8)
+
+
+def test_benchmark_pagerank(tmp_path):
+    bench.generate_corpus(tmp_path, 200, farm_size=20, seed=3)
+    results = {
+        result["operation"]: result
+        for result in bench.benchmark_pagerank(str(tmp_path), 20000)
+    }
+    assert set(results) == {
+        "crawl", "exact_pagerank", "sample_pagerank", "batch_sample_pagerank", "iterate_pagerank"
+    }
+    assert results["crawl"]["pages"] == 200
+    assert results["iterate_pagerank"]["l1_error"] < 1e-6
+    assert results["sample_pagerank"]["l1_error"] < 0.2
+    assert all(result["seconds"] >= 0 and result["memory"] > 0 for result in results.values())
+
+
+def test_generate_corpus_needs_two_pages(tmp_path):
+    for pages in (0, 1):
+        with pytest.raises(ValueError):
+            bench.generate_corpus(tmp_path, pages)
+    assert len(bench.generate_corpus(tmp_path, 2, dangling=0, farms=0)) == 2
@@ -0,0 +1,68 @@
+import os
+import random
+
+import pytest
+
+import pagerank
+from incremental import IncrementalPageRank
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def l1_distance(ranks, expected):
+    return sum(abs(ranks[page] - expected[page]) for page in expected)
+
+
+def test_initial_ranks_match_iteration():
+    corpus = pagerank.crawl(os.path.join(HERE, "corpus1"))
+    incremental = IncrementalPageRank(corpus, pagerank.DAMPING)
+    expected = pagerank.iterate_pagerank(corpus, pagerank.DAMPING, tolerance=1e-14)
+    assert incremental.error_bound() <= incremental.tolerance
+    assert l1_distance(incremental.ranks(), expected) <= incremental.tolerance
+
+
+def test_update_matches_recompute():
+    corpus = pagerank.crawl(os.path.join(HERE, "corpus2"))
+    incremental = IncrementalPageRank(corpus, pagerank.DAMPING)
+
+    # recursion.html has no links, and loses or gains its only inbound link
+    added = [("recursion.html", "python.html"), ("c.html", "ai.html")]
+    removed = [("python.html", "ai.html")]
+    bound = incremental.update(added, removed)
+    for page, link in added:
+        corpus[page].add(link)
+    for page, link in removed:
+        corpus[page].discard(link)
+
+    expected = pagerank.iterate_pagerank(corpus, pagerank.DAMPING, tolerance=1e-14)
+    assert bound <= incremental.tolerance
+    assert l1_distance(incremental.ranks(), expected) <= bound + 1e-9
+
+
+def test_random_updates_match_recompute():
+    rng = random.Random(0)
+    pages = [f"{i}.html" for i in range(200)]
+    corpus = {page: set(rng.sample(pages, rng.randrange(4))) - {page} for page in pages}
+    incremental = IncrementalPageRank(corpus, pagerank.DAMPING, tolerance=1e-8)
+    for _ in range(5):
+        added = [(rng.choice(pages), rng.choice(pages)) for _ in range(10)]
+        removed = [
+            (page, rng.choice(sorted(corpus[page])))
+            for page in rng.sample(pages, 10) if corpus[page]
+        ]
+        bound = incremental.update(added, removed)
+        for page, link in removed:
+            corpus[page].discard(link)
+        for page, link in added:
+            if page != link:
+                corpus[page].add(link)
+        expected = pagerank.iterate_pagerank(corpus, pagerank.DAMPING, tolerance=1e-14)
+        assert l1_distance(incremental.ranks(), expected) <= bound + 1e-9
+        assert bound <= 1e-8
+
+
+def test_update_unknown_page():
+    corpus = pagerank.crawl(os.path.join(HERE, "corpus0"))
+    incremental = IncrementalPageRank(corpus, pagerank.DAMPING)
+    with pytest.raises(KeyError):
+        incremental.update(added=[("1.html", "5.html")])
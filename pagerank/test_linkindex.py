@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import pytest
+
+import pagerank
+from linkgraph import LinkGraph, power_iteration
+from linkindex import INDEX_FILE, LinkIndex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def corpus2(tmp_path):
+    directory = tmp_path / "corpus2"
+    shutil.copytree(os.path.join(HERE, "corpus2"), directory)
+    return str(directory)
+
+
+def test_refresh_parses_only_changed_pages(corpus2):
+    index = LinkIndex(corpus2)
+    assert index.refresh() == set(pagerank.crawl(corpus2))
+    index.save()
+    assert os.path.exists(os.path.join(corpus2, INDEX_FILE))
+
+    index = LinkIndex(corpus2)
+    assert index.refresh() == set()
+
+    with open(os.path.join(corpus2, "c.html"), "a") as f:
+        f.write('<a href="ai.html">AI</a>\n')
+    os.remove(os.path.join(corpus2, "logic.html"))
+    assert index.refresh() == {"c.html", "logic.html"}
+    assert index.corpus() == pagerank.crawl(corpus2)
+
+
+def test_refresh_ignores_touched_pages(corpus2):
+    index = LinkIndex(corpus2)
+    index.refresh()
+    path = os.path.join(corpus2, "ai.html")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.refresh() == set()
+
+
+def test_crawl_with_index(corpus2):
+    assert pagerank.crawl(corpus2, use_index=True) == pagerank.crawl(corpus2)
+    assert pagerank.crawl(corpus2, use_index=True) == pagerank.crawl(corpus2)
+
+
+def test_warm_start_converges_faster(corpus2):
+    corpus = pagerank.crawl(corpus2)
+    ranks = pagerank.iterate_pagerank(corpus, pagerank.DAMPING)
+    corpus["c.html"].add("ai.html")
+    graph = LinkGraph.from_corpus(corpus)
+    _, cold = power_iteration(graph, pagerank.DAMPING, pagerank.TOLERANCE)
+    _, warm = power_iteration(
+        graph, pagerank.DAMPING, pagerank.TOLERANCE, start=graph.to_array(ranks, 0)
+    )
+    assert warm < cold
+    assert pagerank.iterate_pagerank(corpus, pagerank.DAMPING, start=ranks) == pytest.approx(
+        pagerank.iterate_pagerank(corpus, pagerank.DAMPING), abs=1e-6
+    )
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import outofcore
+import pagerank
+from diagnostics import ConvergenceReport
+from ranking import RankTable
+from outofcore import open_edge_list, out_of_core_pagerank, read_pages, write_edge_list
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_write_edge_list(tmp_path):
+    filename = str(tmp_path / "corpus0.edges")
+    assert write_edge_list(os.path.join(HERE, "corpus0"), filename) == (4, 6)
+    degrees, links = open_edge_list(filename)
+    assert read_pages(filename) == ["1.html", "2.html", "3.html", "4.html"]
+    assert list(degrees) == [1, 2, 2, 1]
+    assert sorted(map(tuple, links.tolist())) == [(0, 1), (1, 0), (1, 2), (2, 1), (2, 3), (3, 1)]
+
+
+def test_out_of_core_matches_iteration(tmp_path):
+    directory = os.path.join(HERE, "corpus2")
+    filename = str(tmp_path / "corpus2.edges")
+    write_edge_list(directory, filename, workers=2)
+
+    iterations = []
+    ranks = out_of_core_pagerank(
+        filename, pagerank.DAMPING, pagerank.TOLERANCE, str(tmp_path / "ranks"),
+        block_edges=3, progress=lambda *args: iterations.append(args)
+    )
+    expected = pagerank.iterate_pagerank(pagerank.crawl(directory), pagerank.DAMPING)
+    assert dict(zip(read_pages(filename), ranks.tolist())) == pytest.approx(expected, abs=1e-8)
+    assert iterations[-1][1] < pagerank.TOLERANCE
+    assert [iteration for iteration, _, _ in iterations] == list(range(1, len(iterations) + 1))
+    assert np.fromfile(tmp_path / "ranks").sum() == pytest.approx(1)
+
+
+def test_out_of_core_stops_on_report(tmp_path):
+    filename = str(tmp_path / "corpus2.edges")
+    write_edge_list(os.path.join(HERE, "corpus2"), filename)
+    report = ConvergenceReport(tolerance=1e-3)
+    ranks = out_of_core_pagerank(
+        filename, pagerank.DAMPING, pagerank.TOLERANCE, str(tmp_path / "ranks"), progress=report
+    )
+    assert report.summary()["stop_reason"] == "tolerance"
+    assert report.iterations[-1]["residual"] < 1e-3 <= report.iterations[-2]["residual"]
+    assert ranks.sum() == pytest.approx(1)
+
+
+def test_rank_command_writes_rank_table(tmp_path, monkeypatch):
+    filename = str(tmp_path / "corpus2.edges")
+    write_edge_list(os.path.join(HERE, "corpus2"), filename)
+    monkeypatch.setattr(sys, "argv", ["outofcore.py", "rank", filename])
+    outofcore.main()
+    table = RankTable.load(f"{filename}.ranks")
+    expected = pagerank.iterate_pagerank(pagerank.crawl(os.path.join(HERE, "corpus2")), pagerank.DAMPING)
+    assert table.pages == read_pages(filename)
+    assert {page: table[page] for page in table.pages} == pytest.approx(expected, abs=1e-8)
+    assert sorted(os.listdir(tmp_path)) == ["corpus2.edges", "corpus2.edges.pages", "corpus2.edges.ranks"]
@@ -0,0 +1,149 @@
+import os
+import random
+
+import pytest
+
+import crawler
+import pagerank
+from diagnostics import ConvergenceReport
+from linkgraph import LinkGraph, random_walk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def corpus(name):
+    return pagerank.crawl(os.path.join(HERE, name))
+
+
+def test_iterate_pagerank_corpus0():
+    ranks = pagerank.iterate_pagerank(corpus("corpus0"), pagerank.DAMPING)
+    assert ranks == pytest.approx({
+        "1.html": 0.2199, "2.html": 0.4292, "3.html": 0.2199, "4.html": 0.1310
+    }, abs=1e-4)
+
+
+def test_iterate_pagerank_is_fixed_point():
+    pages = corpus("corpus2")
+    ranks = pagerank.iterate_pagerank(pages, pagerank.DAMPING)
+    assert sum(ranks.values()) == pytest.approx(1)
+    for page in pages:
+        # Pages without links count as linking to every page
+        expected = (1 - pagerank.DAMPING) / len(pages) + pagerank.DAMPING * sum(
+            ranks[other] / len(pages[other]) if pages[other] else ranks[other] / len(pages)
+            for other in pages if page in pages[other] or not pages[other]
+        )
+        assert ranks[page] == pytest.approx(expected, abs=1e-6)
+
+
+def test_iterate_pagerank_dangling_page():
+    pages = {"a.html": {"b.html"}, "b.html": set(), "c.html": {"a.html", "b.html"}}
+    ranks = pagerank.iterate_pagerank(pages, pagerank.DAMPING)
+    # b.html links nowhere, so it is treated as linking to every page
+    n = len(pages)
+    share = ranks["b.html"] / n
+    assert ranks["c.html"] == pytest.approx((1 - pagerank.DAMPING) / n + pagerank.DAMPING * share)
+    assert sum(ranks.values()) == pytest.approx(1)
+
+
+def test_sample_pagerank_close_to_iteration():
+    random.seed(0)
+    pages = corpus("corpus1")
+    sampled = pagerank.sample_pagerank(pages, pagerank.DAMPING, 50000)
+    iterated = pagerank.iterate_pagerank(pages, pagerank.DAMPING)
+    assert set(sampled) == set(pages)
+    assert sum(sampled.values()) == pytest.approx(1)
+    for page in pages:
+        assert sampled[page] == pytest.approx(iterated[page], abs=0.01)
+
+
+def test_random_walk_matches_transition_model():
+    rng = random.Random(1)
+    pages = {"a.html": {"b.html"}, "b.html": set(), "c.html": {"a.html", "b.html"}}
+    graph = LinkGraph.from_corpus(pages)
+    start = graph.page_index["c.html"]
+    trials = 20000
+    counts = sum(random_walk(graph, pagerank.DAMPING, 2, rng, start) for _ in range(trials))
+    counts[start] -= trials
+    expected = pagerank.transition_model(pages, "c.html", pagerank.DAMPING)
+    for page in pages:
+        assert counts[graph.page_index[page]] / trials == pytest.approx(expected[page], abs=0.015)
+
+
+def test_batch_sample_pagerank_close_to_iteration():
+    pages = corpus("corpus2")
+    sampled = pagerank.batch_sample_pagerank(pages, pagerank.DAMPING, 200000, seed=0)
+    iterated = pagerank.iterate_pagerank(pages, pagerank.DAMPING)
+    assert sum(sampled.values()) == pytest.approx(1)
+    for page in pages:
+        assert sampled[page] == pytest.approx(iterated[page], abs=0.005)
+
+
+def test_batch_sample_pagerank_is_seeded():
+    pages = corpus("corpus1")
+    first = pagerank.batch_sample_pagerank(pages, pagerank.DAMPING, 12345, surfers=100, seed=7)
+    second = pagerank.batch_sample_pagerank(pages, pagerank.DAMPING, 12345, surfers=100, seed=7)
+    assert first == second
+    assert sum(first.values()) == pytest.approx(1)
+
+
+def test_crawl_corpus0():
+    assert corpus("corpus0") == {
+        "1.html": {"2.html"},
+        "2.html": {"1.html", "3.html"},
+        "3.html": {"2.html", "4.html"},
+        "4.html": {"2.html"}
+    }
+
+
+def test_crawl_parallel_matches_serial():
+    directory = os.path.join(HERE, "corpus2")
+    assert pagerank.crawl(directory, workers=2) == pagerank.crawl(directory)
+
+
+def test_crawl_memory_maps_large_files(monkeypatch):
+    expected = corpus("corpus1")
+    monkeypatch.setattr(crawler, "MMAP_THRESHOLD", 0)
+    assert corpus("corpus1") == expected
+    assert set(crawler.scan_edges(os.path.join(HERE, "corpus0"))) == {
+        ("1.html", "2.html"), ("2.html", "1.html"), ("2.html", "3.html"),
+        ("3.html", "2.html"), ("3.html", "4.html"), ("4.html", "2.html")
+    }
+
+
+def test_iterate_pagerank_report():
+    pages = corpus("corpus2")
+    report = ConvergenceReport()
+    ranks = pagerank.iterate_pagerank(pages, pagerank.DAMPING, report=report)
+    assert ranks == pagerank.iterate_pagerank(pages, pagerank.DAMPING)
+    residuals = [record["residual"] for record in report.iterations]
+    assert residuals[-1] < pagerank.TOLERANCE <= residuals[-2]
+    assert [record["iteration"] for record in report.iterations] == list(range(1, len(residuals) + 1))
+    assert report.summary()["stop_reason"] is None
+
+
+def test_iterate_pagerank_stops_early():
+    pages = corpus("corpus2")
+    records = []
+    report = ConvergenceReport(tolerance=1e-3, callback=records.append)
+    ranks = pagerank.iterate_pagerank(pages, pagerank.DAMPING, report=report)
+    assert report.summary()["stop_reason"] == "tolerance"
+    assert records == report.iterations
+    assert report.iterations[-1]["residual"] < 1e-3 <= report.iterations[-2]["residual"]
+    assert sum(ranks.values()) == pytest.approx(1)
+
+
+def test_sample_pagerank_report():
+    random.seed(0)
+    pages = corpus("corpus1")
+    report = ConvergenceReport()
+    sampled = pagerank.sample_pagerank(pages, pagerank.DAMPING, 10000, report=report)
+    assert len(report.iterations) == pagerank.CHECKPOINTS
+    assert sum(sampled.values()) == pytest.approx(1)
+    assert all(record["samples_per_second"] > 0 for record in report.iterations)
+    assert report.iterations[-1]["residual"] < report.iterations[0]["residual"]
+
+    random.seed(0)
+    report = ConvergenceReport(patience=1)
+    pagerank.sample_pagerank(pages, pagerank.DAMPING, 10000, report=report)
+    assert report.summary()["stop_reason"] == "stalled"
+    assert len(report.iterations) < pagerank.CHECKPOINTS
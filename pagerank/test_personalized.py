@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pytest
+
+import pagerank
+from linkgraph import LinkGraph
+from personalized import local_push, personalized_pagerank, personalized_ranks, teleport_matrix
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = pagerank.crawl(os.path.join(HERE, "corpus2"))
+
+
+def test_uniform_teleport_is_pagerank():
+    ranks = personalized_ranks(CORPUS, pagerank.DAMPING, [set(CORPUS)], pagerank.TOLERANCE)[0]
+    assert ranks == pytest.approx(pagerank.iterate_pagerank(CORPUS, pagerank.DAMPING), abs=1e-6)
+
+
+def test_batched_matches_single_seeds():
+    graph = LinkGraph.from_corpus(CORPUS)
+    seed_sets = [{"ai.html"}, {"c.html", "python.html"}, {"recursion.html"}]
+    together = personalized_pagerank(
+        graph, pagerank.DAMPING, teleport_matrix(graph, seed_sets), pagerank.TOLERANCE
+    )
+    for column, seeds in enumerate(seed_sets):
+        alone = personalized_pagerank(
+            graph, pagerank.DAMPING, teleport_matrix(graph, [seeds]), pagerank.TOLERANCE
+        )
+        assert together[:, column] == pytest.approx(alone[:, 0], abs=1e-8)
+        assert together[:, column].sum() == pytest.approx(1)
+    # The seed ranks highest in its own personalization
+    assert np.argmax(together[:, 0]) == graph.page_index["ai.html"]
+
+
+def test_local_push_close_to_exact():
+    graph = LinkGraph.from_corpus(CORPUS)
+    seed = graph.page_index["logic.html"]
+    exact = personalized_pagerank(graph, pagerank.DAMPING, teleport_matrix(graph, [{"logic.html"}]), 1e-12)[:, 0]
+    estimates, unpushed = local_push(graph, pagerank.DAMPING, seed, 1e-6)
+    approximate = np.zeros(len(graph))
+    for page, value in estimates.items():
+        approximate[page] = value
+    assert np.abs(approximate - exact).sum() <= unpushed + 1e-9
+    assert unpushed < 1e-4
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+import pagerank
+from ranking import RankTable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_top_matches_full_sort():
+    rng = np.random.default_rng(0)
+    values = rng.random(1000)
+    values[10:20] = values[0]
+    table = RankTable([f"{i}.html" for i in range(1000)], values)
+    ordered = sorted(range(1000), key=lambda i: (-values[i], i))
+    for k in (0, 1, 15, 999, 1000, 2000):
+        assert table.top(k) == [(f"{i}.html", values[i]) for i in ordered[:k]]
+
+
+def test_lookup_and_position():
+    ranks = pagerank.iterate_pagerank(pagerank.crawl(os.path.join(HERE, "corpus0")), pagerank.DAMPING)
+    table = RankTable.from_dict(ranks)
+    assert table["2.html"] == ranks["2.html"]
+    assert table.position("2.html") == 1
+    assert table.position("1.html") == table.position("3.html") == 2
+    assert table.position("4.html") == 4
+    with pytest.raises(KeyError):
+        table["5.html"]
+
+
+def test_save_and_load(tmp_path):
+    ranks = pagerank.iterate_pagerank(pagerank.crawl(os.path.join(HERE, "corpus2")), pagerank.DAMPING)
+    table = RankTable.from_dict(ranks)
+    table.save(tmp_path / "ranks.bin")
+    loaded = RankTable.load(tmp_path / "ranks.bin")
+    assert loaded.pages == table.pages
+    assert loaded.top(3) == table.top(3)
+    assert {page: loaded[page] for page in ranks} == ranks
+    assert os.path.getsize(tmp_path / "ranks.bin") < 40 * len(ranks) + 24
+
+
+def test_load_rejects_other_files(tmp_path):
+    (tmp_path / "ranks.bin").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        RankTable.load(tmp_path / "ranks.bin")
+
+
+def test_top_breaks_ties_at_k_by_page_order():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 20, size=2000).astype(np.float64)
+    table = RankTable([f"{i}.html" for i in range(2000)], values)
+    ordered = sorted(range(2000), key=lambda i: (-values[i], i))
+    straddling = 0
+    for k in rng.integers(1, 2000, size=50):
+        straddling += values[ordered[k - 1]] == values[ordered[k]]
+        assert table.top(k) == [(f"{i}.html", values[i]) for i in ordered[:k]]
+    assert straddling > 40
+
+
+def test_position_matches_count_of_better_pages():
+    values = np.array([0.5, 0.2, 0.5, 0.1, 0.2])
+    table = RankTable(["a", "b", "c", "d", "e"], values)
+    assert [table.position(page) for page in "abcde"] == [1, 3, 1, 5, 3]
@@ -0,0 +1,65 @@
+import os
+import random
+import tracemalloc
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import pagerank
+from linkgraph import LinkGraph, random_walk
+from sharded import SharedLinks, sharded_random_walk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS = pagerank.crawl(os.path.join(HERE, "corpus2"))
+
+
+def test_sharded_sampling_is_reproducible():
+    first = pagerank.sample_pagerank(CORPUS, pagerank.DAMPING, 20001, workers=3, seed=4)
+    second = pagerank.sample_pagerank(CORPUS, pagerank.DAMPING, 20001, workers=3, seed=4)
+    assert first == second
+    assert sum(first.values()) == pytest.approx(1)
+    assert first != pagerank.sample_pagerank(CORPUS, pagerank.DAMPING, 20001, workers=3, seed=5)
+
+
+def test_sharded_sampling_close_to_iteration():
+    sampled = pagerank.sample_pagerank(CORPUS, pagerank.DAMPING, 100000, workers=2, seed=0)
+    iterated = pagerank.iterate_pagerank(CORPUS, pagerank.DAMPING)
+    for page in CORPUS:
+        assert sampled[page] == pytest.approx(iterated[page], abs=0.01)
+
+
+def test_shards_cover_every_sample():
+    graph = LinkGraph.from_corpus(CORPUS)
+    counts = sharded_random_walk(graph, pagerank.DAMPING, 5, workers=8, seed=1)
+    assert counts.dtype == np.int64
+    assert counts.sum() == 5
+
+
+def test_sharded_sampling_rejects_report():
+    with pytest.raises(ValueError):
+        pagerank.sample_pagerank(CORPUS, pagerank.DAMPING, 100, report=lambda *args: False, workers=2)
+
+
+def test_shard_walk_does_not_copy_links():
+    # Dense enough that a private copy of the links would dwarf the counts
+    pages = 1000
+    offsets = np.arange(0, pages * pages, pages - 1, dtype=np.int64)[:pages + 1]
+    targets = np.array([t for page in range(pages) for t in range(pages) if t != page], dtype=np.int64)
+    memory = shared_memory.SharedMemory(create=True, size=8 * (len(offsets) + len(targets)))
+    try:
+        tables = SharedLinks(memory, pages, len(targets))
+        tables.offsets[:] = offsets
+        tables.targets[:] = targets
+        tracemalloc.start()
+        try:
+            counts = random_walk(tables, pagerank.DAMPING, 1000, random.Random(0))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert counts.sum() == 1000
+        assert peak < 8 * len(targets) // 10
+        del tables
+    finally:
+        memory.close()
+        memory.unlink()